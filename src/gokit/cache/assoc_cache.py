@@ -0,0 +1,190 @@
+"""On-disk cache of population-filtered, normalized, propagated gene -> GO associations."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from gokit.cache.obo_cache import relationship_key
+from gokit.core.idnorm import (
+    PopulationFilter,
+    infer_id_mode,
+    normalize_assoc_keys,
+    normalize_gene_set,
+    normalize_one,
+)
+from gokit.core.manifest import sha256_file
+from gokit.core.propagation import propagate_gene_to_go
+from gokit.io.assoc import read_associations
+
+SCHEMA_VERSION = 3
+_MAGIC = b"GOKITASSOC\n"
+_HEADER_LEN = struct.Struct("<Q")
+
+
+@dataclass
+class AssocCached:
+    gene_to_go: dict[str, frozenset[str]]
+    id_mode: str
+    dropped_genes: int
+    cache_hit: bool
+    cache_path: Path
+
+
+def cache_key(
+    *,
+    assoc_path: Path,
+    assoc_format: str,
+    obo_path: Path,
+    relationships: Iterable[str],
+    id_type: str,
+    propagate: bool,
+    population_path: Path,
+) -> dict[str, object]:
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "assoc_sha256": sha256_file(assoc_path),
+        "assoc_format": assoc_format,
+        "obo_sha256": sha256_file(obo_path) if propagate else None,
+        "id_type": id_type,
+        "propagate": propagate,
+        "relationships": relationship_key(relationships) if propagate else "",
+        # Entries only hold population genes.
+        "population_sha256": sha256_file(population_path),
+    }
+
+
+def _cache_file_for(key: dict[str, object], cache_dir: Path) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    return cache_dir / "assoc" / f"{digest}.bin"
+
+
+def _encode(
+    gene_to_go: dict[str, frozenset[str]], id_mode: str, dropped: int, key: dict[str, object]
+) -> bytes:
+    genes = sorted(gene_to_go)
+    terms = sorted({goid for goids in gene_to_go.values() for goid in goids})
+    term_index = {goid: i for i, goid in enumerate(terms)}
+    indptr = array("q", [0])
+    indices = array("i")
+    for gene in genes:
+        indices.extend(sorted(term_index[goid] for goid in gene_to_go[gene]))
+        indptr.append(len(indices))
+    header = json.dumps(
+        {
+            "key": key,
+            "id_mode": id_mode,
+            "dropped_genes": dropped,
+            "byteorder": sys.byteorder,
+            "genes": genes,
+            "terms": terms,
+        }
+    ).encode("utf-8")
+    return b"".join(
+        (_MAGIC, _HEADER_LEN.pack(len(header)), header, indptr.tobytes(), indices.tobytes())
+    )
+
+
+def _decode(data: bytes) -> tuple[dict[str, frozenset[str]], str, int]:
+    if not data.startswith(_MAGIC):
+        raise ValueError("not a gokit association cache")
+    offset = len(_MAGIC)
+    (header_len,) = _HEADER_LEN.unpack_from(data, offset)
+    offset += _HEADER_LEN.size
+    header = json.loads(data[offset : offset + header_len].decode("utf-8"))
+    offset += header_len
+    genes = header["genes"]
+    terms = header["terms"]
+    indptr = array("q")
+    indptr_end = offset + indptr.itemsize * (len(genes) + 1)
+    if indptr_end > len(data):
+        raise ValueError("truncated gokit association cache")
+    indptr.frombytes(data[offset:indptr_end])
+    if header["byteorder"] != sys.byteorder:
+        indptr.byteswap()
+    indices = array("i")
+    # A partly written entry must not decode as a hit with rows missing.
+    if indptr_end + indices.itemsize * indptr[-1] != len(data):
+        raise ValueError("truncated gokit association cache")
+    indices.frombytes(data[indptr_end:])
+    if header["byteorder"] != sys.byteorder:
+        indices.byteswap()
+    # Genes with identical rows share one frozenset, as after propagation.
+    shared: dict[bytes, frozenset[str]] = {}
+    gene_to_go: dict[str, frozenset[str]] = {}
+    for i, gene in enumerate(genes):
+        row = indices[indptr[i] : indptr[i + 1]]
+        key = row.tobytes()
+        goids = shared.get(key)
+        if goids is None:
+            goids = shared[key] = frozenset(terms[t] for t in row)
+        gene_to_go[gene] = goids
+    return gene_to_go, header["id_mode"], header["dropped_genes"]
+
+
+def load_or_build_assoc_cache(
+    *,
+    assoc_path: Path,
+    assoc_format: str,
+    obo_path: Path,
+    go_to_ancestors: dict[str, set[str]],
+    relationships: Iterable[str] = (),
+    id_type: str,
+    propagate: bool,
+    population_path: Path,
+    population_genes: set[str],
+    cache_dir: Path,
+) -> AssocCached:
+    """Normalized (and, with ``propagate``, propagated) associations, cached by content.
+
+    Genes outside the population are skipped while reading, so they are never
+    normalized or propagated; ``dropped_genes`` reports how many.
+    """
+    key = cache_key(
+        assoc_path=assoc_path,
+        assoc_format=assoc_format,
+        obo_path=obo_path,
+        relationships=relationships,
+        id_type=id_type,
+        propagate=propagate,
+        population_path=population_path,
+    )
+    cache_path = _cache_file_for(key, cache_dir)
+    if cache_path.exists():
+        try:
+            gene_to_go, id_mode, dropped = _decode(cache_path.read_bytes())
+        except (ValueError, KeyError, IndexError, struct.error):
+            pass  # Unreadable entry: rebuild and overwrite it.
+        else:
+            return AssocCached(gene_to_go, id_mode, dropped, cache_hit=True, cache_path=cache_path)
+
+    keep = PopulationFilter(population_genes, id_type)
+    raw = read_associations(assoc_path, assoc_format, keep)
+    id_mode = id_type if id_type != "auto" else infer_id_mode(population_genes, set(raw))
+    population = normalize_gene_set(population_genes, id_mode)
+    # With id_type=auto, genes kept only under the other mode drop out here.
+    normalized = {
+        gene: goids
+        for gene, goids in normalize_assoc_keys(raw, id_mode).items()
+        if gene in population
+    }
+    dropped = (
+        keep.dropped + len(raw) - sum(normalize_one(gene, id_mode) in population for gene in raw)
+    )
+    if propagate:
+        gene_to_go = propagate_gene_to_go(normalized, go_to_ancestors)
+    else:
+        gene_to_go = {gene: frozenset(goids) for gene, goids in normalized.items()}
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(_encode(gene_to_go, id_mode, dropped, key))
+    os.replace(tmp_path, cache_path)
+    return AssocCached(gene_to_go, id_mode, dropped, cache_hit=False, cache_path=cache_path)
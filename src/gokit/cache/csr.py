@@ -0,0 +1,150 @@
+"""Flat-buffer cache files holding string-keyed set maps as CSR arrays."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+
+_HEADER_LEN = struct.Struct("<Q")
+_ALIGN = 8
+
+
+class CsrSetMap(Mapping[str, frozenset[str]]):
+    """Read-only ``{key: ids}`` view over CSR arrays of positions in a shared id table.
+
+    Rows are decoded into frozensets on first access and kept.
+    """
+
+    __slots__ = ("ids", "key_codes", "indptr", "indices", "_row_of", "_decoded")
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        keys: Sequence[int],
+        indptr: Sequence[int],
+        indices: Sequence[int],
+    ) -> None:
+        self.ids = ids
+        self.key_codes = keys
+        self.indptr = indptr
+        self.indices = indices
+        self._row_of: dict[str, int] | None = None
+        self._decoded: dict[int, frozenset[str]] = {}
+
+    def _rows(self) -> dict[str, int]:
+        if self._row_of is None:
+            ids = self.ids
+            self._row_of = {ids[k]: r for r, k in enumerate(self.key_codes)}
+        return self._row_of
+
+    def __getitem__(self, key: str) -> frozenset[str]:
+        row = self._rows()[key]
+        out = self._decoded.get(row)
+        if out is None:
+            ids = self.ids
+            out = frozenset(ids[i] for i in self.indices[self.indptr[row] : self.indptr[row + 1]])
+            self._decoded[row] = out
+        return out
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows()
+
+    def __iter__(self) -> Iterator[str]:
+        ids = self.ids
+        return (ids[k] for k in self.key_codes)
+
+    def __len__(self) -> int:
+        return len(self.key_codes)
+
+    def arrays(self) -> tuple[Sequence[int], Sequence[int], Sequence[int]]:
+        return self.key_codes, self.indptr, self.indices
+
+
+def encode_setmap(
+    data: Mapping[str, Iterable[str]], id_index: Mapping[str, int]
+) -> tuple[array, array, array]:
+    """``(keys 'i', indptr 'q', indices 'i')`` for ``data``; rows sorted by id position."""
+    if isinstance(data, CsrSetMap):
+        # Same id table: copy the native-order buffers as they are.
+        keys, indptr, indices = data.arrays()
+        return array("i", bytes(keys)), array("q", bytes(indptr)), array("i", bytes(indices))
+    keys = array("i")
+    indptr = array("q", [0])
+    indices = array("i")
+    for key, values in data.items():
+        keys.append(id_index[key])
+        indices.extend(sorted(id_index[v] for v in values))
+        indptr.append(len(indices))
+    return keys, indptr, indices
+
+
+def write_sections(
+    path: Path, magic: bytes, header: dict[str, object], sections: dict[str, array]
+) -> None:
+    """Write ``magic``, a JSON header and 8-byte aligned raw arrays, atomically.
+
+    The header gains ``byteorder`` and ``sections`` (``name -> [typecode, offset, length]``).
+    """
+    layout: dict[str, list[object]] = {}
+    offset = 0
+    for name, arr in sections.items():
+        layout[name] = [arr.typecode, offset, len(arr)]
+        offset += -(-len(arr) * arr.itemsize // _ALIGN) * _ALIGN
+    head = json.dumps({**header, "byteorder": sys.byteorder, "sections": layout}).encode("utf-8")
+    prefix = len(magic) + _HEADER_LEN.size + len(head)
+    pad = b"\0" * (-prefix % _ALIGN)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(magic + _HEADER_LEN.pack(len(head) + len(pad)) + head + pad)
+        for arr in sections.values():
+            raw = arr.tobytes()
+            handle.write(raw + b"\0" * (-len(raw) % _ALIGN))
+    os.replace(tmp_path, path)
+
+
+def read_sections(
+    path: Path, magic: bytes, *, in_memory: bool = False
+) -> tuple[dict[str, object], dict[str, Sequence]]:
+    """Header and arrays written by ``write_sections``.
+
+    Arrays are zero-copy views into a read-only ``mmap`` when the byte order
+    matches; otherwise they are byte-swapped copies. With ``in_memory`` the
+    file is read into memory instead, so it can be replaced while the arrays
+    are in use (Windows refuses to replace a mapped file).
+    """
+    if in_memory:
+        data: bytes | mmap.mmap = path.read_bytes()
+    else:
+        with path.open("rb") as handle:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[: len(magic)] != magic:
+        raise ValueError(f"not a gokit cache file: {path}")
+    (head_len,) = _HEADER_LEN.unpack_from(data, len(magic))
+    start = len(magic) + _HEADER_LEN.size
+    header = json.loads(bytes(data[start : start + head_len]).rstrip(b"\0"))
+    base = start + head_len
+    view = memoryview(data)
+    swap = header["byteorder"] != sys.byteorder
+    out: dict[str, Sequence] = {}
+    for name, (typecode, offset, length) in header["sections"].items():
+        itemsize = array(typecode).itemsize
+        lo = base + offset
+        hi = lo + length * itemsize
+        if offset < 0 or length < 0 or hi > len(data):
+            raise ValueError(f"truncated cache section {name!r}: {path}")
+        raw = view[lo:hi]
+        if swap:
+            arr = array(typecode, raw.tobytes())
+            arr.byteswap()
+            out[name] = arr
+        else:
+            out[name] = raw.cast(typecode)
+    return header, out
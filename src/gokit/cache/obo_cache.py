@@ -3,98 +3,320 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from gokit.cache.csr import CsrSetMap, encode_setmap, read_sections, write_sections
 from gokit.core.manifest import sha256_file
 from gokit.io.obo import OboMeta, read_obo_graph
 
+SCHEMA_VERSION = 3
+_MAGIC = b"GOKITOBO\n"
+SetMap = Mapping[str, AbstractSet[str]]
+
 
 @dataclass
 class OboCached:
     go_to_namespace: dict[str, str]
-    go_to_parents: dict[str, set[str]]
-    go_to_ancestors: dict[str, set[str]]
+    # Set maps are CsrSetMap views on a cache hit and plain dicts on a build.
+    go_to_parents: SetMap
+    go_to_ancestors: SetMap
+    go_to_relationships: dict[str, SetMap]
+    # Closure over is_a plus the requested relationships; go_to_ancestors when none.
+    propagation_ancestors: SetMap
     meta: OboMeta
     cache_hit: bool
     cache_path: Path
 
 
+@dataclass
+class _Graph:
+    go_to_namespace: dict[str, str]
+    go_to_parents: SetMap
+    go_to_ancestors: SetMap
+    go_to_relationships: dict[str, SetMap]
+    meta: OboMeta
+    closures: dict[str, SetMap] = field(default_factory=dict)
+    # Id table of the binary file the maps view, if any.
+    go_ids: list[str] | None = None
+    # False when migrated from a cache that predates typed relationship edges.
+    typed_edges: bool = True
+
+
 def default_cache_dir() -> Path:
     return Path.home() / ".cache" / "gokit"
 
 
 def _cache_file_for(obo_path: Path, cache_dir: Path) -> Path:
     key = sha256_file(obo_path)
-    return cache_dir / "obo" / f"{key}.json"
+    return cache_dir / "obo" / f"{key}.bin"
+
+
+def relationship_key(relationships: Iterable[str]) -> str:
+    return ",".join(sorted(set(relationships)))
 
 
-def _compute_ancestors(go_to_parents: dict[str, set[str]]) -> dict[str, set[str]]:
-    memo: dict[str, set[str]] = {}
+def _compute_ancestors(go_to_parents: SetMap) -> dict[str, set[str]]:
+    """Ancestor closure of every term, also correct on cycles.
 
-    def dfs(goid: str) -> set[str]:
-        if goid in memo:
-            return memo[goid]
-        parents = go_to_parents.get(goid, set())
-        closure: set[str] = set(parents)
-        for parent in parents:
-            closure.update(dfs(parent))
-        memo[goid] = closure
-        return closure
+    Mixing in typed edges such as has_part can close cycles, so terms are
+    grouped into strongly connected components (iterative Tarjan). Components
+    come out parents first; the members of a cycle share one closure, which
+    contains each of them.
+    """
+    closure_of: dict[str, set[str]] = {}
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    work: list[tuple[str, Iterator[str]]] = []
 
-    for goid in go_to_parents:
-        dfs(goid)
-    return memo
+    def visit(goid: str) -> None:
+        index[goid] = low[goid] = len(index)
+        stack.append(goid)
+        on_stack.add(goid)
+        work.append((goid, iter(go_to_parents.get(goid, ()))))
 
+    for root in list(go_to_parents):
+        if root in index:
+            continue
+        visit(root)
+        while work:
+            goid, parents = work[-1]
+            for parent in parents:
+                if parent not in index:
+                    visit(parent)
+                    break
+                if parent in on_stack:
+                    low[goid] = min(low[goid], index[parent])
+            else:
+                work.pop()
+                if work:
+                    child = work[-1][0]
+                    low[child] = min(low[child], low[goid])
+                if low[goid] != index[goid]:
+                    continue
+                members: set[str] = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.add(member)
+                    if member == goid:
+                        break
+                closure: set[str] = set()
+                for member in members:
+                    for parent in go_to_parents.get(member, ()):
+                        closure.add(parent)
+                        if parent not in members:
+                            closure.update(closure_of[parent])
+                for member in members:
+                    closure_of[member] = closure
+    return closure_of
 
-def _serialize_setmap(data: dict[str, set[str]]) -> dict[str, list[str]]:
-    return {k: sorted(v) for k, v in data.items()}
+
+def _relationship_ancestors(
+    go_to_parents: SetMap,
+    go_to_relationships: dict[str, SetMap],
+    relationships: Iterable[str],
+) -> dict[str, set[str]]:
+    merged = {goid: set(parents) for goid, parents in go_to_parents.items()}
+    for rel in relationships:
+        for goid, parents in go_to_relationships[rel].items():
+            merged.setdefault(goid, set()).update(parents)
+    return _compute_ancestors(merged)
 
 
 def _deserialize_setmap(data: dict[str, list[str]]) -> dict[str, set[str]]:
     return {k: set(v) for k, v in data.items()}
 
 
-def load_or_build_obo_cache(obo_path: Path, cache_dir: Path | None = None) -> OboCached:
+def _setmaps(graph: _Graph) -> dict[str, SetMap]:
+    maps = {"parents": graph.go_to_parents, "ancestors": graph.go_to_ancestors}
+    maps.update({f"rel:{rel}": edges for rel, edges in graph.go_to_relationships.items()})
+    maps.update({f"closure:{key}": closure for key, closure in graph.closures.items()})
+    return maps
+
+
+def _write_binary(cache_path: Path, graph: _Graph, obo_path: Path) -> None:
+    maps = _setmaps(graph)
+    go_ids = graph.go_ids
+    if go_ids is None:
+        ids = set(graph.go_to_namespace)
+        for data in maps.values():
+            ids.update(data)
+            for values in data.values():
+                ids.update(values)
+        go_ids = sorted(ids)
+    id_index = {goid: i for i, goid in enumerate(go_ids)}
+    namespaces = sorted(set(graph.go_to_namespace.values()))
+    ns_code = {ns: i for i, ns in enumerate(namespaces)}
+    sections: dict[str, array] = {
+        "namespace": array("b", (ns_code.get(graph.go_to_namespace.get(g, ""), -1) for g in go_ids))
+    }
+    for name, data in maps.items():
+        keys, indptr, indices = encode_setmap(data, id_index)
+        sections[f"{name}.keys"] = keys
+        sections[f"{name}.indptr"] = indptr
+        sections[f"{name}.indices"] = indices
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "obo_path": str(obo_path),
+        "obo_sha256": sha256_file(obo_path),
+        "format_version": graph.meta.format_version,
+        "data_version": graph.meta.data_version,
+        "go_ids": go_ids,
+        "namespaces": namespaces,
+        "relationships": sorted(graph.go_to_relationships),
+        "closures": sorted(graph.closures),
+        "typed_edges": graph.typed_edges,
+    }
+    write_sections(cache_path, _MAGIC, header, sections)
+
+
+def _read_binary(cache_path: Path, *, in_memory: bool = False) -> _Graph:
+    header, sections = read_sections(cache_path, _MAGIC, in_memory=in_memory)
+    if header["schema_version"] != SCHEMA_VERSION:
+        raise ValueError(f"unsupported OBO cache schema: {header['schema_version']}")
+    go_ids = [sys.intern(goid) for goid in header["go_ids"]]
+    namespaces = [sys.intern(ns) for ns in header["namespaces"]]
+
+    def setmap(name: str) -> CsrSetMap:
+        return CsrSetMap(
+            go_ids,
+            sections[f"{name}.keys"],
+            sections[f"{name}.indptr"],
+            sections[f"{name}.indices"],
+        )
+
+    return _Graph(
+        go_to_namespace={
+            goid: namespaces[code]
+            for goid, code in zip(go_ids, sections["namespace"], strict=True)
+            if code >= 0
+        },
+        go_to_parents=setmap("parents"),
+        go_to_ancestors=setmap("ancestors"),
+        go_to_relationships={
+            sys.intern(rel): setmap(f"rel:{rel}") for rel in header["relationships"]
+        },
+        meta=OboMeta(format_version=header["format_version"], data_version=header["data_version"]),
+        closures={key: setmap(f"closure:{key}") for key in header["closures"]},
+        go_ids=go_ids,
+        typed_edges=header.get("typed_edges", True),
+    )
+
+
+def _read_json(json_path: Path) -> _Graph | None:
+    # The indented-JSON layout of earlier releases. Schema 1 has no typed
+    # relationship edges, so it only serves is_a-only runs.
+    payload = json.loads(json_path.read_text(encoding="utf-8"))
+    if payload.get("schema_version") not in {1, 2}:
+        return None
+    return _Graph(
+        go_to_namespace={goid: sys.intern(ns) for goid, ns in payload["go_to_namespace"].items()},
+        go_to_parents=_deserialize_setmap(payload["go_to_parents"]),
+        go_to_ancestors=_deserialize_setmap(payload["go_to_ancestors"]),
+        go_to_relationships={
+            sys.intern(rel): _deserialize_setmap(edges)
+            for rel, edges in payload.get("go_to_relationships", {}).items()
+        },
+        meta=OboMeta(
+            format_version=payload.get("format_version"),
+            data_version=payload.get("data_version"),
+        ),
+        closures={
+            key: _deserialize_setmap(closure)
+            for key, closure in payload.get("relationship_closures", {}).items()
+        },
+        typed_edges="go_to_relationships" in payload,
+    )
+
+
+def load_or_build_obo_cache(
+    obo_path: Path,
+    cache_dir: Path | None = None,
+    relationships: Iterable[str] = (),
+) -> OboCached:
+    """Parsed OBO plus ancestor closures, cached per OBO content.
+
+    The cache is a flat binary file (GO id table plus CSR arrays) opened with
+    ``mmap``; on a hit, ancestor and parent sets are decoded only when looked up.
+    The ``is_a`` closure is always stored. Each combination of ``relationships``
+    gets its own closure in the same file, computed on first use. A JSON cache
+    from an earlier release is migrated (then removed) instead of reparsing the
+    OBO, unless relationships are requested and it has no typed edges.
+    """
     base = cache_dir or default_cache_dir()
     base.mkdir(parents=True, exist_ok=True)
     cache_path = _cache_file_for(obo_path, base)
+    rel_key = relationship_key(relationships)
 
+    graph: _Graph | None = None
+    dirty = False
+    mapped = False
     if cache_path.exists():
-        payload = json.loads(cache_path.read_text(encoding="utf-8"))
-        return OboCached(
-            go_to_namespace=payload["go_to_namespace"],
-            go_to_parents=_deserialize_setmap(payload["go_to_parents"]),
-            go_to_ancestors=_deserialize_setmap(payload["go_to_ancestors"]),
-            meta=OboMeta(
-                format_version=payload.get("format_version"),
-                data_version=payload.get("data_version"),
-            ),
-            cache_hit=True,
-            cache_path=cache_path,
+        try:
+            graph = _read_binary(cache_path)
+            mapped = True
+        except (ValueError, KeyError, TypeError, struct.error):
+            graph = None  # Unreadable entry: rebuild and overwrite it.
+    json_path = cache_path.with_suffix(".json")
+    if graph is None and json_path.exists():
+        try:
+            graph = _read_json(json_path)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            graph = None  # Corrupt legacy entry: reparse the OBO.
+        dirty = True
+    if graph is not None and rel_key and not graph.typed_edges:
+        graph = None  # Relationship edges were never cached: reparse the OBO.
+
+    cache_hit = graph is not None
+    if graph is None:
+        go_to_namespace, go_to_parents, go_to_relationships, meta = read_obo_graph(obo_path)
+        graph = _Graph(
+            go_to_namespace=go_to_namespace,
+            go_to_parents=go_to_parents,
+            go_to_ancestors=_compute_ancestors(go_to_parents),
+            go_to_relationships=go_to_relationships,
+            meta=meta,
         )
+        dirty = True
 
-    go_to_namespace, go_to_parents, meta = read_obo_graph(obo_path)
-    go_to_ancestors = _compute_ancestors(go_to_parents)
+    if not rel_key:
+        propagation_ancestors = graph.go_to_ancestors
+    else:
+        unknown = sorted(set(relationships) - set(graph.go_to_relationships))
+        if unknown:
+            known = ",".join(sorted(graph.go_to_relationships)) or "none"
+            raise ValueError(
+                f"Relationship(s) not in the ontology: {','.join(unknown)} (available: {known})"
+            )
+        if rel_key not in graph.closures:
+            if mapped:
+                # The file is rewritten below: drop the mapping first.
+                graph = _read_binary(cache_path, in_memory=True)
+            graph.closures[rel_key] = _relationship_ancestors(
+                graph.go_to_parents, graph.go_to_relationships, rel_key.split(",")
+            )
+            dirty = True
+        propagation_ancestors = graph.closures[rel_key]
 
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "schema_version": 1,
-        "obo_path": str(obo_path),
-        "obo_sha256": sha256_file(obo_path),
-        "format_version": meta.format_version,
-        "data_version": meta.data_version,
-        "go_to_namespace": go_to_namespace,
-        "go_to_parents": _serialize_setmap(go_to_parents),
-        "go_to_ancestors": _serialize_setmap(go_to_ancestors),
-    }
-    cache_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    if dirty:
+        _write_binary(cache_path, graph, obo_path)
+        json_path.unlink(missing_ok=True)  # Superseded by the binary file.
 
     return OboCached(
-        go_to_namespace=go_to_namespace,
-        go_to_parents=go_to_parents,
-        go_to_ancestors=go_to_ancestors,
-        meta=meta,
-        cache_hit=False,
+        go_to_namespace=graph.go_to_namespace,
+        go_to_parents=graph.go_to_parents,
+        go_to_ancestors=graph.go_to_ancestors,
+        go_to_relationships=graph.go_to_relationships,
+        propagation_ancestors=propagation_ancestors,
+        meta=graph.meta,
+        cache_hit=cache_hit,
         cache_path=cache_path,
     )
@@ -5,19 +5,31 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
+from gokit.cache.assoc_cache import load_or_build_assoc_cache
 from gokit.cache.obo_cache import default_cache_dir, load_or_build_obo_cache
 from gokit.cli.common import parse_csv_list, require_existing_file
-from gokit.core.enrichment import EnrichmentResult, OraRunner
-from gokit.core.idnorm import infer_id_mode, normalize_assoc_keys, normalize_gene_set
+from gokit.core.enrichment import OraRunner
+from gokit.core.idnorm import (
+    normalize_gene_list,
+    normalize_gene_set,
+    normalize_one,
+)
 from gokit.core.manifest import build_input_files, default_manifest, write_manifest
-from gokit.core.propagation import propagate_gene_to_go
+from gokit.core.parallel import WorkerStats, run_batch_parallel
+from gokit.core.ranktest import run_rank_test
+from gokit.core.resampling import PermutationFdr
+from gokit.core.results import ResultTable
 from gokit.core.semantic import (
     StudyTermSet,
     pairwise_semantic_similarity,
     pairwise_semantic_summary,
 )
-from gokit.io.assoc import read_associations
-from gokit.io.study import read_gene_set, read_study_manifest
+from gokit.io.study import (
+    read_gene_scores,
+    read_gene_set,
+    read_ranked_genes,
+    read_study_manifest,
+)
 from gokit.report.parquet_writer import write_combined_parquet, write_results_parquet
 from gokit.report.writers import (
     write_combined_jsonl,
@@ -42,7 +54,7 @@ def _emit_plots(
     plot_min_similarity: float,
     plot_max_edges: int,
     study_ids: list[str],
-    combined_rows: list[tuple[str, EnrichmentResult]],
+    combined: ResultTable,
     pairwise: dict[tuple[str, str], float],
     is_batch: bool,
     out_prefix: Path,
@@ -60,13 +72,20 @@ def _emit_plots(
     plot_dir.mkdir(parents=True, exist_ok=True)
     plot_rows = [
         PlotRow(
-            go_id=row.go_id,
-            namespace=row.namespace,
-            direction=row.direction,
-            p_adjusted=row.p_adjusted,
+            go_id=go_id,
+            namespace=namespace,
+            direction=direction,
+            p_adjusted=p_adjusted,
             study_id=study_id,
         )
-        for study_id, row in combined_rows
+        for study_id, go_id, namespace, direction, p_adjusted in zip(
+            combined.study_id_column(),
+            combined.go_id_column(),
+            combined.namespace_column(),
+            combined.direction_column(),
+            combined.p_adjusted,
+            strict=True,
+        )
     ]
 
     if is_batch:
@@ -145,6 +164,27 @@ def register_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentPars
         default="",
         help="Batch manifest with lines as '<study_name>\\t<study_path>' or '<study_path>'",
     )
+    parser.add_argument(
+        "--ranked",
+        default="",
+        help="Ranked gene list (best first); tested at each of --cutoffs in one pass",
+    )
+    parser.add_argument(
+        "--cutoffs",
+        default="",
+        help="Comma-separated top-N cutoffs for --ranked (e.g. 100,200,500)",
+    )
+    parser.add_argument(
+        "--ranked-scores",
+        default="",
+        help="'<gene>\\t<score>' file for --test rank",
+    )
+    parser.add_argument(
+        "--test",
+        default="ora",
+        choices=["ora", "rank"],
+        help="ora: over-representation of a gene set; rank: Mann-Whitney U on --ranked-scores",
+    )
     parser.add_argument("--population", required=True, help="Population gene list file")
     parser.add_argument("--assoc", required=True, help="Association file")
     parser.add_argument(
@@ -176,10 +216,62 @@ def register_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentPars
         choices=["auto", "str", "int"],
         help="Gene ID normalization mode for study/population/association keys",
     )
+    parser.add_argument(
+        "--exact-pvalues",
+        action="store_true",
+        help="Compute hypergeometric tails with exact big-integer arithmetic (slow)",
+    )
+    parser.add_argument(
+        "--backend",
+        default="auto",
+        choices=["auto", "numpy", "python"],
+        help="P-value engine (auto uses NumPy when installed)",
+    )
+    parser.add_argument(
+        "--pvalue-cache-mb",
+        type=float,
+        default=64.0,
+        help="Memory cap for the p-value memo shared across studies (0 disables)",
+    )
+    parser.add_argument(
+        "--min-term-size",
+        type=int,
+        default=1,
+        help="Only test GO terms annotated to at least this many population genes",
+    )
+    parser.add_argument(
+        "--max-term-size",
+        type=int,
+        default=None,
+        help="Only test GO terms annotated to at most this many population genes",
+    )
     parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument(
+        "--tarone",
+        action="store_true",
+        help=(
+            "With --test-direction over, drop terms that cannot reach --alpha "
+            "and correct the rest as Tarone's m tests"
+        ),
+    )
     parser.add_argument("--seed", type=int, default=None)
-    parser.add_argument("--fdr-resamples", type=int, default=0)
-    parser.add_argument("--relationships", default="", help="Comma-separated relationships")
+    parser.add_argument(
+        "--fdr-resamples",
+        type=int,
+        default=0,
+        help="Replace p_adjusted with an empirical FDR from N random same-size studies",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for batch studies and --fdr-resamples (output is unaffected)",
+    )
+    parser.add_argument(
+        "--relationships",
+        default="",
+        help="Comma-separated OBO relationship types (e.g. part_of) to propagate along with is_a",
+    )
     parser.add_argument("--cache-dir", default=str(default_cache_dir()), help="Cache directory")
     parser.add_argument(
         "--no-propagate-counts",
@@ -187,6 +279,12 @@ def register_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentPars
         help="Do not propagate associations to ancestor GO terms",
     )
     parser.add_argument("--store-items", default="auto", choices=["auto", "always", "never"])
+    parser.add_argument(
+        "--store-items-alpha",
+        type=float,
+        default=None,
+        help="With --store-items always, only attach gene lists to rows with p_adjusted <= this",
+    )
     parser.add_argument("--out", required=True, help="Output prefix path")
     parser.add_argument("--out-formats", default="tsv,jsonl", help="Comma-separated output formats")
     parser.add_argument(
@@ -242,11 +340,28 @@ def register_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentPars
 
 
 def run(args: argparse.Namespace) -> int:
-    if bool(args.study) == bool(args.studies):
-        raise ValueError("Provide exactly one of --study or --studies")
+    if sum(map(bool, (args.study, args.studies, args.ranked, args.ranked_scores))) != 1:
+        raise ValueError("Provide exactly one of --study, --studies, --ranked or --ranked-scores")
+    if (args.test == "rank") != bool(args.ranked_scores):
+        raise ValueError("--test rank and --ranked-scores must be used together")
+    if args.test == "rank" and (args.tarone or args.fdr_resamples > 0):
+        raise ValueError("--tarone and --fdr-resamples apply to --test ora only")
+    cutoffs: list[int] = []
+    if args.ranked:
+        try:
+            cutoffs = sorted({int(c) for c in parse_csv_list(args.cutoffs)})
+        except ValueError:
+            raise ValueError("--cutoffs must be comma-separated integers") from None
+        if not cutoffs or cutoffs[0] <= 0:
+            raise ValueError("--ranked requires positive --cutoffs")
 
     study_path = require_existing_file(args.study, "study") if args.study else None
     studies_manifest = require_existing_file(args.studies, "studies") if args.studies else None
+    ranked_path = require_existing_file(args.ranked, "ranked") if args.ranked else None
+    scores_path = (
+        require_existing_file(args.ranked_scores, "ranked-scores") if args.ranked_scores else None
+    )
+    single = bool(args.study or args.ranked_scores)
     population = require_existing_file(args.population, "population")
     assoc = require_existing_file(args.assoc, "association")
     obo = require_existing_file(args.obo, "obo")
@@ -258,6 +373,14 @@ def run(args: argparse.Namespace) -> int:
     invalid_plots = [p for p in plot_kinds if p not in allowed_plots]
     if invalid_plots:
         raise ValueError(f"Unsupported plot kind(s): {','.join(invalid_plots)}")
+    if args.tarone and args.test_direction != "over":
+        raise ValueError("--tarone requires --test-direction over")
+    if args.tarone and args.fdr_resamples > 0:
+        # The null would count terms that Tarone pruned from the observed rows.
+        raise ValueError("--tarone cannot be combined with --fdr-resamples")
+    tarone_alpha = args.alpha if args.tarone else None
+    if args.max_term_size is not None and args.max_term_size < args.min_term_size:
+        raise ValueError("--max-term-size must be >= --min-term-size")
     out_prefix = Path(args.out)
 
     manifest_path = (
@@ -274,12 +397,16 @@ def run(args: argparse.Namespace) -> int:
         named_inputs.append(("study", study_path))
     if studies_manifest:
         named_inputs.append(("studies", studies_manifest))
+    if ranked_path:
+        named_inputs.append(("ranked", ranked_path))
+    if scores_path:
+        named_inputs.append(("ranked_scores", scores_path))
     input_files = build_input_files(named_inputs)
 
     if args.dry_run:
         notes = "Dry-run validation completed."
-        results = []
-        combined_rows: list[tuple[str, EnrichmentResult]] = []
+        results = ResultTable.empty()
+        combined = ResultTable.empty()
         pairwise: dict[tuple[str, str], float] = {}
         top_pairs: dict[tuple[str, str], list[tuple[str, str, float]]] = {}
         semantic_summary_rows = []
@@ -287,35 +414,75 @@ def run(args: argparse.Namespace) -> int:
         semantic_warning = ""
     else:
         pop_genes_raw = read_gene_set(population)
-        gene_to_go_raw = read_associations(assoc, args.assoc_format)
+        obo_cached = load_or_build_obo_cache(obo, Path(args.cache_dir), relationships)
+        obo_meta = obo_cached.meta
 
-        id_mode = (
-            args.id_type
-            if args.id_type != "auto"
-            else infer_id_mode(pop_genes_raw, set(gene_to_go_raw))
+        assoc_cached = load_or_build_assoc_cache(
+            assoc_path=assoc,
+            assoc_format=args.assoc_format,
+            obo_path=obo,
+            go_to_ancestors=obo_cached.propagation_ancestors,
+            relationships=relationships,
+            id_type=args.id_type,
+            propagate=not args.no_propagate_counts,
+            population_path=population,
+            population_genes=pop_genes_raw,
+            cache_dir=Path(args.cache_dir),
         )
+        id_mode = assoc_cached.id_mode
         pop_genes = normalize_gene_set(pop_genes_raw, id_mode)
-        gene_to_go = normalize_assoc_keys(gene_to_go_raw, id_mode)
-
-        obo_cached = load_or_build_obo_cache(obo, Path(args.cache_dir))
-        obo_meta = obo_cached.meta
-
-        if not args.no_propagate_counts:
-            gene_to_go = propagate_gene_to_go(gene_to_go, obo_cached.go_to_ancestors)
+        gene_to_go = assoc_cached.gene_to_go
 
         runner = OraRunner(
             population_genes=pop_genes,
             gene_to_go=gene_to_go,
             go_to_namespace=obo_cached.go_to_namespace,
+            exact=args.exact_pvalues,
+            backend=args.backend,
+            pvalue_cache_bytes=int(args.pvalue_cache_mb * 1024 * 1024),
+            min_term_size=args.min_term_size,
+            max_term_size=args.max_term_size,
         )
 
-        results = []
-        combined_rows: list[tuple[str, EnrichmentResult]] = []
+        results = ResultTable.empty()
+        combined = ResultTable.empty()
         pairwise: dict[tuple[str, str], float] = {}
         top_pairs: dict[tuple[str, str], list[tuple[str, str, float]]] = {}
         semantic_summary_rows = []
         study_ids: list[str] = []
         semantic_warning = ""
+        worker_stats: list[WorkerStats] = []
+
+        fdr = (
+            PermutationFdr(
+                runner,
+                namespace_filter=args.namespace,
+                test_direction=args.test_direction,
+                seed=args.seed,
+                jobs=args.jobs,
+            )
+            if args.fdr_resamples > 0
+            else None
+        )
+
+        store_items = args.store_items == "always"
+
+        def _apply_fdr(studies: list[tuple[str, set[str], ResultTable]]) -> None:
+            # Runs after any batch pool is done, so resample workers never
+            # overlap it; the resample pool is closed even if a study fails.
+            # Item sets are gated by the empirical FDR, so they are attached here.
+            if fdr is None:
+                return
+            with fdr:
+                for key, study_genes, rows in studies:
+                    fdr.apply(
+                        rows,
+                        study_n=len(study_genes & runner.population_genes),
+                        resamples=args.fdr_resamples,
+                        key=key,
+                    )
+                    if store_items:
+                        runner.attach_items(rows, study_genes, args.store_items_alpha)
 
         if study_path:
             study_genes = normalize_gene_set(read_gene_set(study_path), id_mode)
@@ -324,32 +491,82 @@ def run(args: argparse.Namespace) -> int:
                 namespace_filter=args.namespace,
                 method=args.method,
                 test_direction=args.test_direction,
-                store_items=(args.store_items == "always"),
+                store_items=store_items and fdr is None,
+                items_alpha=args.store_items_alpha,
+                tarone_alpha=tarone_alpha,
             )
-            combined_rows = [("study", r) for r in results]
+            _apply_fdr([("study", study_genes, results)])
+            combined = ResultTable.concat([("study", results)])
             study_ids = ["study"]
+        elif scores_path:
+            scores: dict[str, float] = {}
+            for gene, score in read_gene_scores(scores_path).items():
+                key = normalize_one(gene, id_mode)
+                if key is not None:
+                    scores.setdefault(key, score)
+            results = run_rank_test(
+                runner,
+                scores=scores,
+                namespace_filter=args.namespace,
+                method=args.method,
+                test_direction=args.test_direction,
+            )
+            combined = ResultTable.concat([("study", results)])
+            study_ids = ["study"]
+        elif ranked_path:
+            ranked = normalize_gene_list(read_ranked_genes(ranked_path), id_mode)
+            study_sets = [(f"top_{c}", set(ranked[:c])) for c in cutoffs]
+            batch = runner.run_sweep(
+                ranked_genes=ranked,
+                cutoffs=cutoffs,
+                namespace_filter=args.namespace,
+                method=args.method,
+                test_direction=args.test_direction,
+                store_items=store_items and fdr is None,
+                items_alpha=args.store_items_alpha,
+                tarone_alpha=tarone_alpha,
+            )
         else:
-            studies = read_study_manifest(studies_manifest)
-            termsets: list[StudyTermSet] = []
-            for study_id, file_path in studies:
+            study_sets = []
+            for study_id, file_path in read_study_manifest(studies_manifest):
                 path = require_existing_file(str(file_path), f"study({study_id})")
-                study_genes = normalize_gene_set(read_gene_set(path), id_mode)
-                rows = runner.run_study(
-                    study_genes=study_genes,
-                    namespace_filter=args.namespace,
-                    method=args.method,
-                    test_direction=args.test_direction,
-                    store_items=(args.store_items == "always"),
-                )
-                combined_rows.extend((study_id, row) for row in rows)
-                rows_sem = [r for r in rows if r.direction == "over"]
-                if args.semantic_namespace != "all":
-                    rows_sem = [r for r in rows_sem if r.namespace == args.semantic_namespace]
-                if args.semantic_min_padjsig is not None:
-                    rows_sem = [r for r in rows_sem if r.p_adjusted <= args.semantic_min_padjsig]
-                termsets.append(StudyTermSet(study_id=study_id, go_ids={r.go_id for r in rows_sem}))
+                study_sets.append((study_id, normalize_gene_set(read_gene_set(path), id_mode)))
+            batch, worker_stats = run_batch_parallel(
+                runner,
+                studies=[genes for _, genes in study_sets],
+                jobs=args.jobs,
+                namespace_filter=args.namespace,
+                method=args.method,
+                test_direction=args.test_direction,
+                store_items=store_items and fdr is None,
+                items_alpha=args.store_items_alpha,
+                tarone_alpha=tarone_alpha,
+            )
+        if not single:
+            _apply_fdr(
+                [
+                    (study_id, study_genes, rows)
+                    for (study_id, study_genes), rows in zip(study_sets, batch, strict=True)
+                ]
+            )
+            termsets: list[StudyTermSet] = []
+            for (study_id, _), rows in zip(study_sets, batch, strict=True):
+                go_ids = rows.go_id_column()
+                namespaces = rows.namespace_column()
+                selected = {
+                    go_ids[i]
+                    for i in range(len(rows))
+                    if rows.over[i]
+                    and args.semantic_namespace in ("all", namespaces[i])
+                    and (
+                        args.semantic_min_padjsig is None
+                        or rows.p_adjusted[i] <= args.semantic_min_padjsig
+                    )
+                }
+                termsets.append(StudyTermSet(study_id=study_id, go_ids=selected))
                 study_ids.append(study_id)
-            results = [row for _, row in combined_rows]
+            combined = ResultTable.concat(list(zip(study_ids, batch, strict=True)))
+            results = combined
             if args.compare_semantic:
                 selected_counts = {t.study_id: len(t.go_ids) for t in termsets}
                 selected_total = sum(selected_counts.values())
@@ -377,14 +594,22 @@ def run(args: argparse.Namespace) -> int:
                     semantic_summary_rows = pairwise_semantic_summary(
                         termsets, obo_cached.go_to_ancestors, pairwise
                     )
-
+        throughput = (
+            ",".join(f"{w.worker}:{w.studies_per_s:.2f}" for w in worker_stats)
+            if worker_stats
+            else "na"
+        )
         notes = (
             f"Computed {len(results)} GO rows; "
             f"obo_format={obo_meta.format_version or 'na'}; "
             f"obo_data={obo_meta.data_version or 'na'}; "
             f"cache_hit={obo_cached.cache_hit}; "
+            f"assoc_cache_hit={assoc_cached.cache_hit}; "
+            f"assoc_genes_dropped={assoc_cached.dropped_genes}; "
             f"propagate={not args.no_propagate_counts}; "
             f"batch={bool(args.studies)}; "
+            f"test={args.test}; "
+            f"ranked_cutoffs={','.join(map(str, cutoffs)) or 'na'}; "
             f"semantic_compared={bool(pairwise)}; "
             f"semantic_metric={args.semantic_metric if args.compare_semantic else 'na'}; "
             f"semantic_namespace={args.semantic_namespace if args.compare_semantic else 'na'}; "
@@ -392,6 +617,20 @@ def run(args: argparse.Namespace) -> int:
             f"semantic_warning={semantic_warning or 'none'}; "
             f"emit_plots={','.join(plot_kinds) if plot_kinds else 'none'}; "
             f"test_direction={args.test_direction}; "
+            f"exact_pvalues={args.exact_pvalues}; "
+            f"fdr_resamples={args.fdr_resamples}; "
+            f"fdr_seed={fdr.seed if fdr is not None else 'na'}; "
+            f"jobs={args.jobs}; "
+            f"worker_studies_per_s={throughput}; "
+            f"p_adjusted_source={'empirical_fdr' if fdr is not None else args.method}; "
+            f"log_factorial_bytes={runner.log_factorial_nbytes}; "
+            f"{runner.pvalue_cache.summary()}; "
+            f"term_size={args.min_term_size}..{args.max_term_size or 'na'}; "
+            f"candidate_terms={len(runner.candidates(args.namespace))}; "
+            f"term_classes={runner.n_term_classes}/{runner.annotation.n_terms}; "
+            f"tests_collapsed={runner.tests_collapsed}; "
+            f"tarone={args.tarone}; "
+            f"tarone_pruned={runner.terms_pruned if args.tarone else 'na'}; "
             f"id_type={id_mode}."
         )
 
@@ -409,7 +648,7 @@ def run(args: argparse.Namespace) -> int:
     write_manifest(manifest_path, manifest)
 
     if not args.dry_run:
-        if args.study:
+        if single:
             if "tsv" in out_formats:
                 write_tsv(out_prefix.with_suffix(".tsv"), results)
                 write_grouped_summary_single(
@@ -429,7 +668,7 @@ def run(args: argparse.Namespace) -> int:
             out_dir = out_prefix
             studies_dir = out_dir / "studies"
             for study_id in study_ids:
-                rows = [row for sid, row in combined_rows if sid == study_id]
+                rows = combined.for_study(study_id)
                 if "tsv" in out_formats:
                     write_tsv(studies_dir / f"{study_id}.tsv", rows)
                     write_grouped_summary_single(
@@ -446,17 +685,17 @@ def run(args: argparse.Namespace) -> int:
                         print(str(exc))
                         return 1
             if "tsv" in out_formats:
-                write_combined_tsv(out_dir / "all_studies.tsv", combined_rows)
+                write_combined_tsv(out_dir / "all_studies.tsv", combined)
                 write_grouped_summary_batch(
                     out_dir / "grouped_summary.tsv",
-                    combined_rows,
+                    combined,
                     args.alpha,
                 )
             if "jsonl" in out_formats:
-                write_combined_jsonl(out_dir / "all_studies.jsonl", combined_rows)
+                write_combined_jsonl(out_dir / "all_studies.jsonl", combined)
             if "parquet" in out_formats:
                 try:
-                    write_combined_parquet(out_dir / "all_studies.parquet", combined_rows)
+                    write_combined_parquet(out_dir / "all_studies.parquet", combined)
                 except RuntimeError as exc:
                     print(str(exc))
                     return 1
@@ -477,7 +716,7 @@ def run(args: argparse.Namespace) -> int:
         if plot_kinds:
             if args.plot_dir:
                 plot_dir = Path(args.plot_dir)
-            elif args.study:
+            elif single:
                 plot_dir = out_prefix.parent / "figures"
             else:
                 plot_dir = out_prefix / "figures"
@@ -491,9 +730,9 @@ def run(args: argparse.Namespace) -> int:
                     plot_min_similarity=args.plot_min_similarity,
                     plot_max_edges=args.plot_max_edges,
                     study_ids=study_ids,
-                    combined_rows=combined_rows,
+                    combined=combined,
                     pairwise=pairwise,
-                    is_batch=bool(args.studies),
+                    is_batch=not single,
                     out_prefix=out_prefix,
                 )
                 print(f"Plots written: {plot_dir}")
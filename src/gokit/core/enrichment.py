@@ -2,13 +2,36 @@
 
 from __future__ import annotations
 
+from array import array
 from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
 
-from gokit.core.stats import adjust_pvalues, fisher_left_tail, fisher_right_tail
+from gokit.core.interning import AnnotationIndex, build_annotation_index
+from gokit.core.results import ResultTable
+from gokit.core.stats import (
+    PValueCache,
+    adjust_pvalues,
+    hypergeom_tail_arrays,
+    log_factorial_table,
+    min_attainable_pvalue,
+    tarone_threshold,
+)
+from gokit.core.vectorized import (
+    bh_adjust_array,
+    choose_over,
+    grouped_tail_lookup,
+    np,
+    numpy_available,
+    require_numpy,
+    tail_arrays,
+)
 
+# Upper bound on study x term cells counted per batch chunk (int64 -> 32 MiB).
+_BATCH_CELLS = 1 << 22
 
-@dataclass
+
+@dataclass(slots=True)
 class EnrichmentResult:
     go_id: str
     namespace: str
@@ -23,6 +46,30 @@ class EnrichmentResult:
     pop_items: set[str] | None = None
 
 
+@dataclass
+class StudyHandle:
+    """A study kept open by ``OraRunner.open_study`` for incremental updates."""
+
+    genes: set[int]
+    counts: array
+    options: dict[str, object]
+    results: ResultTable
+
+    @property
+    def study_n(self) -> int:
+        return len(self.genes)
+
+
+@dataclass(slots=True)
+class _Candidates:
+    """Terms tested under one namespace filter, with their per-term inputs."""
+
+    terms: array
+    pop_counts: array
+    ns_codes: array
+    classes: array
+
+
 _NS_MAP = {
     "biological_process": "BP",
     "molecular_function": "MF",
@@ -37,7 +84,30 @@ def _canonical_ns(ns: str | None) -> str:
 
 
 class OraRunner:
-    """Reusable ORA runner that caches population term counts."""
+    """Reusable ORA runner that caches population term counts.
+
+    The runner also owns one ``log(k!)`` table up to ``pop_n`` that every Fisher
+    test of every study reads from. ``backend="auto"`` evaluates each study's
+    terms in one batched NumPy call when NumPy is installed and falls back to
+    the scalar engine otherwise; ``exact=True`` always uses the scalar engine.
+    Tail p-values come from per-term-size cumulative arrays memoized across
+    studies in a bounded ``PValueCache``.
+
+    Genes and GO ids are interned to dense ints and the population annotation
+    is held as CSR arrays (``self.annotation``); studies are counted from those
+    arrays rather than from the string sets.
+
+    Terms annotated to exactly the same population genes (e.g. chains of
+    single-child terms after propagation) have the same contingency table in
+    every study; each such class is tested once per study and its p-value
+    copied to the members before correction. ``tests_collapsed`` counts the
+    tests saved.
+
+    With ``tarone_alpha`` (over-representation only), terms whose smallest
+    attainable p-value cannot reach Tarone's ``alpha / m`` are dropped before
+    any tail is computed and the rest are corrected as ``m`` tests;
+    ``terms_pruned`` counts the dropped rows.
+    """
 
     def __init__(
         self,
@@ -45,143 +115,640 @@ class OraRunner:
         population_genes: set[str],
         gene_to_go: dict[str, set[str]],
         go_to_namespace: dict[str, str],
+        exact: bool = False,
+        backend: str = "auto",
+        pvalue_cache_bytes: int = 64 * 1024 * 1024,
+        min_term_size: int = 1,
+        max_term_size: int | None = None,
+    ) -> None:
+        population_genes = set(population_genes)
+        self._setup(
+            annotation=build_annotation_index(population_genes, gene_to_go),
+            population_genes=population_genes,
+            gene_to_go=gene_to_go,
+            go_to_namespace=go_to_namespace,
+            log_factorials=log_factorial_table(len(population_genes)),
+            exact=exact,
+            backend=backend,
+            pvalue_cache_bytes=pvalue_cache_bytes,
+            min_term_size=min_term_size,
+            max_term_size=max_term_size,
+        )
+
+    def _setup(
+        self,
+        *,
+        annotation: AnnotationIndex,
+        population_genes: set[str],
+        gene_to_go: Mapping[str, Iterable[str]],
+        go_to_namespace: dict[str, str],
+        log_factorials: Sequence[float],
+        exact: bool,
+        backend: str,
+        pvalue_cache_bytes: int,
+        min_term_size: int = 1,
+        max_term_size: int | None = None,
+        term_classes: tuple[Sequence[int], int] | None = None,
     ) -> None:
-        self.population_genes = set(population_genes)
+        if backend not in {"auto", "numpy", "python"}:
+            raise ValueError(f"Unsupported backend: {backend}")
+        if backend == "numpy":
+            require_numpy()
+        self.population_genes = population_genes
         self.gene_to_go = gene_to_go
         self.go_to_namespace = go_to_namespace
+        self.exact = exact
+        self.backend = backend
+        self._use_numpy = backend != "python" and not exact and numpy_available()
+        self.annotation = annotation
+        self._term_ns = [_canonical_ns(go_to_namespace.get(g)) for g in annotation.go_ids]
+        self._namespaces = sorted(set(self._term_ns))
+        ns_code = {ns: i for i, ns in enumerate(self._namespaces)}
+        self._term_ns_code = array("i", (ns_code[ns] for ns in self._term_ns))
         self.go_to_pop_count = self._build_go_to_pop_count()
+        self._term_class, self.n_term_classes = term_classes or annotation.term_classes()
+        self.min_term_size = min_term_size
+        self.max_term_size = max_term_size
+        self._candidates = self._build_candidates()
+        self.tests_collapsed = 0
+        self.terms_pruned = 0
+        self._tarone_cache: dict[tuple[int, str, float], tuple[frozenset[int], int]] = {}
+        self.log_factorials = log_factorials
+        self.pvalue_cache = PValueCache(pvalue_cache_bytes)
+
+    def export_shared(self):
+        """Copy the interned annotation into shared memory; see ``gokit.core.shared``."""
+        from gokit.core.shared import export_runner
+
+        return export_runner(self)
+
+    @classmethod
+    def attach_shared(cls, handle) -> OraRunner:
+        """Zero-copy, read-only runner over blocks made by ``export_shared``."""
+        from gokit.core.shared import attach_runner
+
+        return attach_runner(handle)
+
+    @property
+    def log_factorial_nbytes(self) -> int:
+        return len(self.log_factorials) * self.log_factorials.itemsize
 
     def _build_go_to_pop_count(self) -> dict[str, int]:
-        go_to_pop_genes: dict[str, set[str]] = defaultdict(set)
-        for gene in self.population_genes:
-            for goid in self.gene_to_go.get(gene, set()):
-                go_to_pop_genes[goid].add(gene)
-        return {goid: len(genes) for goid, genes in go_to_pop_genes.items()}
+        return dict(zip(self.annotation.go_ids, self.annotation.pop_counts, strict=True))
 
-    def run_study(
-        self,
-        *,
-        study_genes: set[str],
-        namespace_filter: str,
-        method: str = "fdr_bh",
-        test_direction: str = "both",
-        store_items: bool = False,
-    ) -> list[EnrichmentResult]:
-        if test_direction not in {"over", "under", "both"}:
-            raise ValueError(f"Unsupported test_direction: {test_direction}")
+    def _build_candidates(self) -> dict[str, _Candidates]:
+        # Tested GO ints per namespace filter, with their pop counts, namespace
+        # codes and equivalence classes laid out alongside. The size bounds
+        # apply here only, so go_to_pop_count keeps every term for IC-based
+        # semantic metrics.
+        low = self.min_term_size
+        high = self.max_term_size
+        pop_counts = self.annotation.pop_counts
+        candidates = {
+            ns: _Candidates(array("i"), array("q"), array("i"), array("i"))
+            for ns in ("all", *self._namespaces)
+        }
+        for t, size in enumerate(pop_counts):
+            if size < low or (high is not None and size > high):
+                continue
+            for ns in ("all", self._term_ns[t]):
+                entry = candidates[ns]
+                entry.terms.append(t)
+                entry.pop_counts.append(size)
+                entry.ns_codes.append(self._term_ns_code[t])
+                entry.classes.append(self._term_class[t])
+        return candidates
 
-        study = set(study_genes).intersection(self.population_genes)
-        go_to_study_count: dict[str, int] = defaultdict(int)
-        go_to_study_items: dict[str, set[str]] = defaultdict(set)
-        go_to_pop_items: dict[str, set[str]] | None = defaultdict(set) if store_items else None
+    def _candidates_for(self, namespace_filter: str) -> _Candidates:
+        key = namespace_filter if namespace_filter == "all" else _canonical_ns(namespace_filter)
+        entry = self._candidates.get(key)
+        if entry is None:
+            entry = _Candidates(array("i"), array("q"), array("i"), array("i"))
+        return entry
 
-        if store_items and go_to_pop_items is not None:
-            for gene in self.population_genes:
-                for goid in self.gene_to_go.get(gene, set()):
-                    go_to_pop_items[goid].add(gene)
+    def candidates(self, namespace_filter: str) -> array:
+        """GO ints tested under ``namespace_filter`` (after the term-size bounds)."""
+        return self._candidates_for(namespace_filter).terms
 
-        for gene in study:
-            for goid in self.gene_to_go.get(gene, set()):
-                go_to_study_count[goid] += 1
-                if store_items:
-                    go_to_study_items[goid].add(gene)
+    def pop_items(self, go_id: str) -> set[str]:
+        """Population genes annotated to ``go_id``, from the runner's inverted index."""
+        index = self.annotation
+        term = index.go_index.get(go_id)
+        if term is None:
+            return set()
+        return {index.gene_ids[g] for g in index.genes_of(term)}
 
-        rows: list[tuple[str, str, str, int, int, int, int, float]] = []
-        pvals: list[float] = []
+    def study_items(self, go_id: str, study_genes: set[str]) -> set[str]:
+        """Study genes annotated to ``go_id`` (on-demand counterpart of ``store_items``)."""
+        index = self.annotation
+        term = index.go_index.get(go_id)
+        if term is None:
+            return set()
+        study = set(index.gene_ints(study_genes))
+        return {index.gene_ids[g] for g in index.genes_of(term) if g in study}
 
-        candidate_goids: set[str]
-        if test_direction == "over":
-            candidate_goids = set(go_to_study_count)
-        else:
-            candidate_goids = set(self.go_to_pop_count)
+    def attach_items(
+        self, table: ResultTable, study_genes: set[str], items_alpha: float | None = None
+    ) -> None:
+        """Attach item sets to ``table`` rows gated by its current ``p_adjusted``.
 
-        pop_n = len(self.population_genes)
-        study_n = len(study)
-        for goid in candidate_goids:
-            study_count = go_to_study_count.get(goid, 0)
-            pop_count = self.go_to_pop_count.get(goid, 0)
-            if pop_count <= 0:
-                continue
+        For callers that replace ``p_adjusted`` after the run (the empirical FDR).
+        """
+        self._attach_items(table, self.annotation.gene_ints(study_genes), items_alpha)
 
-            ns = _canonical_ns(self.go_to_namespace.get(goid))
-            if namespace_filter != "all" and ns != namespace_filter:
-                continue
+    def _study_items(self, study: list[int], terms: set[int]) -> dict[int, set[str]]:
+        # One pass over the study's CSR rows, keeping only the requested terms.
+        index = self.annotation
+        items: dict[int, set[str]] = {t: set() for t in terms}
+        for g in study:
+            gene = index.gene_ids[g]
+            for t in index.terms_of(g):
+                if t in items:
+                    items[t].add(gene)
+        return items
+
+    def _choose_over(
+        self,
+        *,
+        pop_n: int,
+        study_n: int,
+        pop_counts: list[int],
+        study_counts: list[int],
+        test_direction: str,
+    ) -> list[bool]:
+        if self._use_numpy:
+            return choose_over(
+                pop_n=pop_n,
+                study_n=study_n,
+                pop_counts=pop_counts,
+                study_counts=study_counts,
+                test_direction=test_direction,
+            ).tolist()
+        if test_direction != "both":
+            return [test_direction == "over"] * len(pop_counts)
+        out: list[bool] = []
+        for pop_count, study_count in zip(pop_counts, study_counts, strict=True):
+            expected = (study_n * pop_count / pop_n) if pop_n > 0 else 0.0
+            out.append(study_count >= expected)
+        return out
 
-            if test_direction == "over":
-                if study_count <= 0:
-                    continue
-                direction = "over"
-                p_unc = fisher_right_tail(
+    def _tail_arrays(
+        self, pop_n: int, study_n: int, pop_count: int, n_terms: int = 1
+    ) -> tuple[Sequence[float], Sequence[float]]:
+        key = (pop_n, study_n, pop_count)
+        arrays = self.pvalue_cache.get(key, n_terms)
+        if arrays is None:
+            if self._use_numpy:
+                arrays = tail_arrays(
                     pop_n=pop_n,
                     pop_count=pop_count,
                     study_n=study_n,
-                    study_count=study_count,
+                    log_factorials=self.log_factorials,
                 )
-            elif test_direction == "under":
-                direction = "under"
-                p_unc = fisher_left_tail(
+            else:
+                arrays = hypergeom_tail_arrays(
                     pop_n=pop_n,
                     pop_count=pop_count,
                     study_n=study_n,
-                    study_count=study_count,
+                    exact=self.exact,
+                    log_factorials=self.log_factorials,
                 )
-            else:
-                expected = (study_n * pop_count / pop_n) if pop_n > 0 else 0.0
-                if study_count >= expected:
-                    direction = "over"
-                    p_unc = fisher_right_tail(
-                        pop_n=pop_n,
-                        pop_count=pop_count,
-                        study_n=study_n,
-                        study_count=study_count,
-                    )
-                else:
-                    direction = "under"
-                    p_unc = fisher_left_tail(
-                        pop_n=pop_n,
-                        pop_count=pop_count,
-                        study_n=study_n,
-                        study_count=study_count,
+            self.pvalue_cache.put(key, arrays)
+        return arrays
+
+    def _pvalues(
+        self,
+        *,
+        pop_n: int,
+        study_n: int,
+        pop_counts: list[int],
+        study_counts: list[int],
+        test_direction: str,
+    ) -> tuple[list[bool], list[float]]:
+        # Terms are grouped by pop_count: each distinct size gets one cumulative
+        # tail array for this study_n and every term is a single index into it.
+        is_over = self._choose_over(
+            pop_n=pop_n,
+            study_n=study_n,
+            pop_counts=pop_counts,
+            study_counts=study_counts,
+            test_direction=test_direction,
+        )
+        if self._use_numpy:
+            pvals = grouped_tail_lookup(
+                pop_counts=pop_counts,
+                study_counts=study_counts,
+                is_over=is_over,
+                arrays_for=lambda size, n: self._tail_arrays(pop_n, study_n, size, n),
+            ).tolist()
+            return is_over, pvals
+
+        by_size: dict[int, list[int]] = defaultdict(list)
+        for idx, pop_count in enumerate(pop_counts):
+            by_size[pop_count].append(idx)
+        pvals = [0.0] * len(pop_counts)
+        for pop_count, idxs in by_size.items():
+            left, right = self._tail_arrays(pop_n, study_n, pop_count, len(idxs))
+            for idx in idxs:
+                tail = right if is_over[idx] else left
+                pvals[idx] = tail[study_counts[idx]]
+        return is_over, pvals
+
+    def run_study(
+        self,
+        *,
+        study_genes: set[str],
+        namespace_filter: str,
+        method: str = "fdr_bh",
+        test_direction: str = "both",
+        store_items: bool = False,
+        items_alpha: float | None = None,
+        tarone_alpha: float | None = None,
+    ) -> ResultTable:
+        """Test one study; rows come back as a columnar ``ResultTable``.
+
+        With ``store_items``, item sets are attached only to rows with
+        ``p_adjusted <= items_alpha`` (every row when ``items_alpha`` is None);
+        ``pop_items``/``study_items`` fetch them for any other term on demand.
+        """
+        self._check_options(test_direction, tarone_alpha)
+
+        study = self.annotation.gene_ints(study_genes)
+        return self._results(
+            study=study,
+            counts=self.annotation.count_terms(study),
+            namespace_filter=namespace_filter,
+            method=method,
+            test_direction=test_direction,
+            store_items=store_items,
+            items_alpha=items_alpha,
+            tarone_alpha=tarone_alpha,
+        )
+
+    def open_study(
+        self,
+        *,
+        study_genes: set[str],
+        namespace_filter: str,
+        method: str = "fdr_bh",
+        test_direction: str = "both",
+        store_items: bool = False,
+        items_alpha: float | None = None,
+        tarone_alpha: float | None = None,
+    ) -> StudyHandle:
+        """``run_study`` that keeps per-term study counts for ``update_study``."""
+        self._check_options(test_direction, tarone_alpha)
+
+        study = self.annotation.gene_ints(study_genes)
+        handle = StudyHandle(
+            genes=set(study),
+            counts=array("q", self.annotation.count_terms(study)),
+            options={
+                "namespace_filter": namespace_filter,
+                "method": method,
+                "test_direction": test_direction,
+                "store_items": store_items,
+                "items_alpha": items_alpha,
+                "tarone_alpha": tarone_alpha,
+            },
+            results=ResultTable.empty(self.annotation.go_ids, self._namespaces),
+        )
+        handle.results = self._results(study=study, counts=handle.counts, **handle.options)
+        return handle
+
+    def update_study(
+        self,
+        handle: StudyHandle,
+        *,
+        delta_add: Iterable[str] = (),
+        delta_remove: Iterable[str] = (),
+    ) -> ResultTable:
+        """Add/remove genes of an open study and return its new results.
+
+        Only the CSR rows of the changed genes are visited to update the term
+        counts. Every p-value still depends on the new study size, so all
+        candidates are re-read from the p-value cache; toggling between sizes
+        already seen is then lookups only.
+        """
+        index = self.annotation
+        added = set(index.gene_ints(delta_add)) - handle.genes
+        removed = set(index.gene_ints(delta_remove)) & handle.genes
+        counts = handle.counts
+        for genes, step in ((added, 1), (removed, -1)):
+            for g in genes:
+                for t in index.terms_of(g):
+                    counts[t] += step
+        handle.genes |= added
+        handle.genes -= removed
+        handle.results = self._results(
+            study=sorted(handle.genes), counts=counts, **handle.options
+        )
+        return handle.results
+
+    def run_sweep(
+        self,
+        *,
+        ranked_genes: Sequence[str],
+        cutoffs: Sequence[int],
+        namespace_filter: str,
+        method: str = "fdr_bh",
+        test_direction: str = "both",
+        store_items: bool = False,
+        items_alpha: float | None = None,
+        tarone_alpha: float | None = None,
+    ) -> list[ResultTable]:
+        """Results for the top ``cutoff`` genes of ``ranked_genes``, for each cutoff.
+
+        The list is walked once in rank order: each cutoff adds only the genes
+        since the previous one to an open study (see ``update_study``).
+        Results come back in ``cutoffs`` order.
+        """
+        order = sorted(set(cutoffs))
+        if not order or order[0] < 0:
+            raise ValueError("cutoffs must be non-negative and non-empty")
+        handle = self.open_study(
+            study_genes=set(ranked_genes[: order[0]]),
+            namespace_filter=namespace_filter,
+            method=method,
+            test_direction=test_direction,
+            store_items=store_items,
+            items_alpha=items_alpha,
+            tarone_alpha=tarone_alpha,
+        )
+        by_cutoff = {order[0]: handle.results}
+        for lo, hi in zip(order[:-1], order[1:], strict=True):
+            by_cutoff[hi] = self.update_study(handle, delta_add=ranked_genes[lo:hi])
+        return [by_cutoff[c] for c in cutoffs]
+
+    def run_batch(
+        self,
+        *,
+        studies: Sequence[set[str]],
+        namespace_filter: str,
+        method: str = "fdr_bh",
+        test_direction: str = "both",
+        store_items: bool = False,
+        items_alpha: float | None = None,
+        tarone_alpha: float | None = None,
+    ) -> list[ResultTable]:
+        """Run many studies at once; identical to calling ``run_study`` per study.
+
+        With NumPy, the study x gene indicator matrix is multiplied by the
+        gene x GO annotation matrix in chunks of studies: one ``bincount`` over
+        ``study * n_terms + term`` keys gathered from the CSR rows.
+        """
+        self._check_options(test_direction, tarone_alpha)
+
+        index = self.annotation
+        members = [index.gene_ints(study_genes) for study_genes in studies]
+        out: list[ResultTable] = []
+        chunk = max(1, _BATCH_CELLS // max(index.n_terms, 1))
+        for lo in range(0, len(members), chunk):
+            rows = members[lo : lo + chunk]
+            for study, counts in zip(rows, self._count_batch(rows), strict=True):
+                out.append(
+                    self._results(
+                        study=study,
+                        counts=counts,
+                        namespace_filter=namespace_filter,
+                        method=method,
+                        test_direction=test_direction,
+                        store_items=store_items,
+                        items_alpha=items_alpha,
+                        tarone_alpha=tarone_alpha,
                     )
-            rows.append(
-                (
-                    goid,
-                    ns,
-                    direction,
-                    study_count,
-                    study_n,
-                    pop_count,
-                    pop_n,
-                    p_unc,
                 )
+        return out
+
+    def _count_batch(self, studies: list[list[int]]) -> Iterable[Sequence[int]]:
+        index = self.annotation
+        if np is None:
+            return [index.count_terms(study) for study in studies]
+        indptr, indices = index.np_arrays()
+        genes = np.fromiter(
+            (g for study in studies for g in study),
+            dtype=np.int64,
+            count=sum(len(study) for study in studies),
+        )
+        rows = np.repeat(np.arange(len(studies)), [len(study) for study in studies])
+        starts = indptr[genes]
+        lengths = indptr[genes + 1] - starts
+        total = int(lengths.sum())
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        terms = indices[offsets + np.arange(total)]
+        keys = np.repeat(rows, lengths) * index.n_terms + terms
+        counts = np.bincount(keys, minlength=len(studies) * index.n_terms)
+        return (row.tolist() for row in counts.reshape(len(studies), index.n_terms))
+
+    def _results(
+        self,
+        *,
+        study: list[int],
+        counts: Sequence[int],
+        namespace_filter: str,
+        method: str,
+        test_direction: str,
+        store_items: bool,
+        items_alpha: float | None,
+        tarone_alpha: float | None,
+    ) -> ResultTable:
+        index = self.annotation
+        pop_n = index.n_genes
+        study_n = len(study)
+        cand = self._candidates_for(namespace_filter)
+        testable: frozenset[int] | None = None
+        n_tests = None
+        if tarone_alpha is not None:
+            testable, n_tests = self._tarone(study_n, namespace_filter, tarone_alpha)
+        if self._use_numpy:
+            table = self._table_numpy(
+                cand=cand,
+                counts=counts,
+                study_n=study_n,
+                method=method,
+                test_direction=test_direction,
+                testable=testable,
+                n_tests=n_tests,
             )
-            pvals.append(p_unc)
-
-        padj = adjust_pvalues(pvals, method)
-        results: list[EnrichmentResult] = []
-        for idx, row in enumerate(rows):
-            goid, ns, direction, st_cnt, st_n, pop_cnt, pop_n, p_unc = row
-            results.append(
-                EnrichmentResult(
-                    go_id=goid,
-                    namespace=ns,
-                    direction=direction,
-                    study_count=st_cnt,
-                    study_n=st_n,
-                    pop_count=pop_cnt,
-                    pop_n=pop_n,
-                    p_uncorrected=p_unc,
-                    p_adjusted=padj[idx],
-                    study_items=(go_to_study_items.get(goid, set()) if store_items else None),
-                    pop_items=(
-                        go_to_pop_items.get(goid, set())
-                        if store_items and go_to_pop_items
-                        else None
-                    ),
+            if store_items:
+                self._attach_items(table, study, items_alpha)
+            return table
+        term_counts = [counts[t] for t in cand.terms]
+        columns = (cand.terms, cand.pop_counts, cand.ns_codes, cand.classes)
+        if test_direction != "over":
+            # Copies, so result tables never alias the runner's candidate arrays.
+            terms, pop_counts, ns_codes, classes = (array(col.typecode, col) for col in columns)
+        else:
+            keep = [
+                i
+                for i, (study_count, size) in enumerate(
+                    zip(term_counts, cand.pop_counts, strict=True)
                 )
+                if study_count > 0 and (testable is None or size in testable)
+            ]
+            self.terms_pruned += sum(1 for k in term_counts if k > 0) - len(keep)
+            term_counts = [term_counts[i] for i in keep]
+            terms, pop_counts, ns_codes, classes = (
+                array(col.typecode, (col[i] for i in keep)) for col in columns
             )
-        results.sort(key=lambda r: (r.p_adjusted, r.p_uncorrected, r.direction, r.go_id))
-        return results
+
+        # Test each equivalence class once; ``slots`` maps terms to class inputs.
+        slots = array("i")
+        slot_of: dict[int, int] = {}
+        class_counts: list[int] = []
+        class_sizes: list[int] = []
+        for cls, study_count, size in zip(classes, term_counts, pop_counts, strict=True):
+            slot = slot_of.setdefault(cls, len(class_counts))
+            if slot == len(class_counts):
+                class_counts.append(study_count)
+                class_sizes.append(size)
+            slots.append(slot)
+        class_over, class_pvals = self._pvalues(
+            pop_n=pop_n,
+            study_n=study_n,
+            pop_counts=class_sizes,
+            study_counts=class_counts,
+            test_direction=test_direction,
+        )
+        self.tests_collapsed += len(terms) - len(class_counts)
+        pvals = [class_pvals[i] for i in slots]
+        n_tested = len(terms)
+        table = ResultTable(
+            go_ids=index.go_ids,
+            namespaces=self._namespaces,
+            go_codes=terms,
+            ns_codes=ns_codes,
+            over=array("b", (class_over[i] for i in slots)),
+            study_count=array("q", term_counts),
+            study_n=array("q", [study_n]) * n_tested,
+            pop_count=pop_counts,
+            pop_n=array("q", [pop_n]) * n_tested,
+            p_uncorrected=array("d", pvals),
+            p_adjusted=array("d", adjust_pvalues(pvals, method, n_tests)),
+        )
+        if store_items:
+            self._attach_items(table, study, items_alpha)
+        return table.sort()
+
+    def _table_numpy(
+        self,
+        *,
+        cand: _Candidates,
+        counts: Sequence[int],
+        study_n: int,
+        method: str,
+        test_direction: str,
+        testable: frozenset[int] | None,
+        n_tests: int | None,
+    ) -> ResultTable:
+        # Same rows and values as the scalar path, built and sorted as arrays.
+        index = self.annotation
+        pop_n = index.n_genes
+        terms = np.frombuffer(cand.terms, dtype=np.int32)
+        sizes = np.frombuffer(cand.pop_counts, dtype=np.int64)
+        ns_codes = np.frombuffer(cand.ns_codes, dtype=np.int32)
+        classes = np.frombuffer(cand.classes, dtype=np.int32)
+        if isinstance(counts, array):
+            term_counts = np.frombuffer(counts, dtype=np.int64)[terms]
+        else:
+            term_counts = np.asarray(counts, dtype=np.int64)[terms]
+        if test_direction == "over":
+            keep = term_counts > 0
+            if testable is not None:
+                kept = keep.sum()
+                keep &= np.isin(sizes, np.fromiter(testable, dtype=np.int64))
+                self.terms_pruned += int(kept - keep.sum())
+            terms, sizes, ns_codes, classes, term_counts = (
+                col[keep] for col in (terms, sizes, ns_codes, classes, term_counts)
+            )
+
+        _, first, slots = np.unique(classes, return_index=True, return_inverse=True)
+        class_sizes = sizes[first]
+        class_counts = term_counts[first]
+        class_over = choose_over(
+            pop_n=pop_n,
+            study_n=study_n,
+            pop_counts=class_sizes,
+            study_counts=class_counts,
+            test_direction=test_direction,
+        )
+        class_pvals = grouped_tail_lookup(
+            pop_counts=class_sizes,
+            study_counts=class_counts,
+            is_over=class_over,
+            arrays_for=lambda size, n: self._tail_arrays(pop_n, study_n, size, n),
+        )
+        self.tests_collapsed += len(terms) - len(first)
+        over = class_over[slots]
+        pvals = class_pvals[slots]
+        if method.lower() == "fdr_bh":
+            adjusted = bh_adjust_array(pvals, n_tests)
+        else:
+            adjusted = np.asarray(adjust_pvalues(pvals.tolist(), method, n_tests))
+        # (p_adjusted, p_uncorrected, direction, go_id): "over" sorts before
+        # "under" and GO ints follow GO id order.
+        order = np.lexsort((terms, ~over, pvals, adjusted))
+        n = len(order)
+        return ResultTable(
+            go_ids=index.go_ids,
+            namespaces=self._namespaces,
+            go_codes=array("i", terms[order].tobytes()),
+            ns_codes=array("i", ns_codes[order].tobytes()),
+            over=array("b", over[order].astype(np.int8).tobytes()),
+            study_count=array("q", term_counts[order].tobytes()),
+            study_n=array("q", [study_n]) * n,
+            pop_count=array("q", sizes[order].tobytes()),
+            pop_n=array("q", [pop_n]) * n,
+            p_uncorrected=array("d", pvals[order].tobytes()),
+            p_adjusted=array("d", np.asarray(adjusted, dtype=np.float64)[order].tobytes()),
+        )
+
+    def _check_options(self, test_direction: str, tarone_alpha: float | None) -> None:
+        if test_direction not in {"over", "under", "both"}:
+            raise ValueError(f"Unsupported test_direction: {test_direction}")
+        if tarone_alpha is not None and test_direction != "over":
+            raise ValueError("Tarone pruning requires test_direction='over'")
+
+    def _tarone(
+        self, study_n: int, namespace_filter: str, alpha: float
+    ) -> tuple[frozenset[int], int]:
+        # Minimum attainable p-values depend only on term size, so the testable
+        # sizes and m are shared by every study with this study_n.
+        key = (study_n, namespace_filter, alpha)
+        cached = self._tarone_cache.get(key)
+        if cached is None:
+            index = self.annotation
+            sizes = self._candidates_for(namespace_filter).pop_counts
+            min_p = {
+                size: min_attainable_pvalue(
+                    pop_n=index.n_genes,
+                    pop_count=size,
+                    study_n=study_n,
+                    log_factorials=self.log_factorials,
+                )
+                for size in set(sizes)
+            }
+            m = tarone_threshold([min_p[size] for size in sizes], alpha)
+            cached = (frozenset(size for size, p in min_p.items() if p <= alpha / m), m)
+            self._tarone_cache[key] = cached
+        return cached
+
+    def _attach_items(
+        self,
+        table: ResultTable,
+        study: list[int],
+        items_alpha: float | None,
+    ) -> None:
+        gated = [
+            i
+            for i, p in enumerate(table.p_adjusted)
+            if items_alpha is None or p <= items_alpha
+        ]
+        study_items = self._study_items(study, {table.go_codes[i] for i in gated})
+        for i in gated:
+            term = table.go_codes[i]
+            table.study_items[i] = study_items[term]
+            table.pop_items[i] = self.pop_items(table.go_ids[term])
 
 
 def run_ora(
@@ -194,12 +761,16 @@ def run_ora(
     method: str = "fdr_bh",
     test_direction: str = "both",
     store_items: bool = False,
-) -> list[EnrichmentResult]:
+    exact: bool = False,
+    backend: str = "auto",
+) -> ResultTable:
     """Convenience wrapper for one-off runs."""
     runner = OraRunner(
         population_genes=population_genes,
         gene_to_go=gene_to_go,
         go_to_namespace=go_to_namespace,
+        exact=exact,
+        backend=backend,
     )
     return runner.run_study(
         study_genes=study_genes,
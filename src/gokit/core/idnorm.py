@@ -27,6 +27,16 @@ def normalize_gene_set(genes: set[str], mode: str) -> set[str]:
     return out
 
 
+def normalize_gene_list(genes: list[str], mode: str) -> list[str]:
+    """Order-preserving ``normalize_gene_set``; duplicates keep their first position."""
+    out: dict[str, None] = {}
+    for gid in genes:
+        n = normalize_one(gid, mode)
+        if n is not None:
+            out.setdefault(n, None)
+    return list(out)
+
+
 def normalize_assoc_keys(assoc: dict[str, set[str]], mode: str) -> dict[str, set[str]]:
     out: dict[str, set[str]] = {}
     for gid, gos in assoc.items():
@@ -49,3 +59,26 @@ def infer_id_mode(population_genes: set[str], assoc_keys: set[str]) -> str:
     if overlap_int > overlap_str:
         return "int"
     return "str"
+
+
+class PopulationFilter:
+    """Association-reader ``keep`` predicate for genes that can match the population.
+
+    With ``mode="auto"`` a gene is kept if it matches under either normalization,
+    so ``infer_id_mode`` gives the same answer on the kept keys as on all keys.
+    ``dropped`` counts the distinct rejected IDs.
+    """
+
+    def __init__(self, population_genes: set[str], mode: str) -> None:
+        modes = ("str", "int") if mode == "auto" else (mode,)
+        self._targets = [(m, normalize_gene_set(population_genes, m)) for m in modes]
+        self._seen: dict[str, bool] = {}
+        self.dropped = 0
+
+    def __call__(self, gene_id: str) -> bool:
+        keep = self._seen.get(gene_id)
+        if keep is None:
+            keep = any(normalize_one(gene_id, m) in pop for m, pop in self._targets)
+            self._seen[gene_id] = keep
+            self.dropped += not keep
+        return keep
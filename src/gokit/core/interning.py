@@ -0,0 +1,140 @@
+"""Dense integer interning of gene/GO identifiers with CSR annotation storage."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+from gokit.core.vectorized import np
+
+
+@dataclass
+class AnnotationIndex:
+    """Population annotation as CSR arrays over interned ids.
+
+    Row ``g`` of ``indptr``/``indices`` lists the GO ints annotated to gene int
+    ``g``. Genes and GO ids are interned in sorted order so the layout does not
+    depend on set iteration order.
+    """
+
+    gene_ids: list[str]
+    go_ids: list[str]
+    gene_index: dict[str, int]
+    go_index: dict[str, int]
+    indptr: array
+    indices: array
+    pop_counts: array
+    _np_cache: dict[str, object] = field(default_factory=dict, repr=False)
+    _by_term: tuple[Sequence[int], Sequence[int]] | None = field(default=None, repr=False)
+
+    @property
+    def n_genes(self) -> int:
+        return len(self.gene_ids)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.go_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.indptr, self.indices, self.pop_counts))
+
+    def gene_ints(self, genes: Iterable[str]) -> list[int]:
+        """Interned ints of the genes that belong to the population, sorted."""
+        gene_index = self.gene_index
+        return sorted({gene_index[g] for g in genes if g in gene_index})
+
+    def terms_of(self, gene: int) -> array:
+        return self.indices[self.indptr[gene] : self.indptr[gene + 1]]
+
+    def genes_of(self, term: int) -> array:
+        """Gene ints annotated to GO int ``term`` (inverted index, built on first use)."""
+        term_indptr, term_genes = self.inverse()
+        return term_genes[term_indptr[term] : term_indptr[term + 1]]
+
+    def inverse(self) -> tuple[Sequence[int], Sequence[int]]:
+        """Term-major CSR ``(term_indptr, term_genes)``, built once and kept."""
+        if self._by_term is None:
+            self._by_term = self._invert()
+        return self._by_term
+
+    def _invert(self) -> tuple[array, array]:
+        term_indptr = array("q", [0])
+        for count in self.pop_counts:
+            term_indptr.append(term_indptr[-1] + count)
+        if np is not None:
+            indptr, indices = self.np_arrays()
+            entry_gene = np.repeat(np.arange(self.n_genes, dtype=np.int32), np.diff(indptr))
+            order = np.argsort(indices, kind="stable")
+            return term_indptr, array("i", entry_gene[order].tobytes())
+        fill = array("q", term_indptr[:-1])
+        term_genes = array("i", bytes(4 * len(self.indices)))
+        for g in range(self.n_genes):
+            for t in self.terms_of(g):
+                term_genes[fill[t]] = g
+                fill[t] += 1
+        return term_indptr, term_genes
+
+    def term_classes(self) -> tuple[array, int]:
+        """Class id per GO int, equal for terms annotated to the same population genes.
+
+        Classes are numbered in order of their lowest GO int.
+        """
+        term_indptr, term_genes = self.inverse()
+        classes: dict[bytes, int] = {}
+        term_class = array("i", bytes(4 * self.n_terms))
+        for t in range(self.n_terms):
+            key = term_genes[term_indptr[t] : term_indptr[t + 1]].tobytes()
+            term_class[t] = classes.setdefault(key, len(classes))
+        return term_class, len(classes)
+
+    def np_arrays(self):
+        """Zero-copy NumPy views of ``(indptr, indices)``."""
+        if not self._np_cache:
+            self._np_cache["indptr"] = np.frombuffer(self.indptr, dtype=np.int64)
+            self._np_cache["indices"] = np.frombuffer(self.indices, dtype=np.int32)
+        return self._np_cache["indptr"], self._np_cache["indices"]
+
+    def count_terms(self, genes: list[int]) -> Sequence[int]:
+        """Per-GO-int annotation counts over the gene ints ``genes``."""
+        if np is not None and genes:
+            indptr, indices = self.np_arrays()
+            rows = [indices[indptr[g] : indptr[g + 1]] for g in genes]
+            return np.bincount(np.concatenate(rows), minlength=self.n_terms).tolist()
+        counts = array("q", bytes(8 * self.n_terms))
+        indptr = self.indptr
+        indices = self.indices
+        for g in genes:
+            for t in indices[indptr[g] : indptr[g + 1]]:
+                counts[t] += 1
+        return counts
+
+
+def build_annotation_index(
+    population_genes: Iterable[str],
+    gene_to_go: dict[str, set[str]],
+) -> AnnotationIndex:
+    gene_ids = sorted(set(population_genes))
+    go_ids = sorted({goid for gene in gene_ids for goid in gene_to_go.get(gene, ())})
+    gene_index = {gene: i for i, gene in enumerate(gene_ids)}
+    go_index = {goid: i for i, goid in enumerate(go_ids)}
+
+    indptr = array("q", [0])
+    indices = array("i")
+    pop_counts = array("q", bytes(8 * len(go_ids)))
+    for gene in gene_ids:
+        row = sorted(go_index[goid] for goid in gene_to_go.get(gene, ()))
+        indices.extend(row)
+        indptr.append(len(indices))
+        for t in row:
+            pop_counts[t] += 1
+    return AnnotationIndex(
+        gene_ids=gene_ids,
+        go_ids=go_ids,
+        gene_index=gene_index,
+        go_index=go_index,
+        indptr=indptr,
+        indices=indices,
+        pop_counts=pop_counts,
+    )
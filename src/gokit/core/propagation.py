@@ -6,11 +6,23 @@ from __future__ import annotations
 def propagate_gene_to_go(
     gene_to_go: dict[str, set[str]],
     go_to_ancestors: dict[str, set[str]],
-) -> dict[str, set[str]]:
-    propagated: dict[str, set[str]] = {}
+) -> dict[str, frozenset[str]]:
+    """Each gene's terms plus all their ancestors.
+
+    Genes are grouped by their direct annotation set, so each distinct closure
+    is computed once; genes with equal closures share one frozenset.
+    """
+    by_direct: dict[frozenset[str], frozenset[str]] = {}
+    by_closure: dict[frozenset[str], frozenset[str]] = {}
+    propagated: dict[str, frozenset[str]] = {}
     for gene, goids in gene_to_go.items():
-        out = set(goids)
-        for goid in goids:
-            out.update(go_to_ancestors.get(goid, set()))
-        propagated[gene] = out
+        direct = frozenset(goids)
+        closure = by_direct.get(direct)
+        if closure is None:
+            out = set(direct)
+            for goid in direct:
+                out.update(go_to_ancestors.get(goid, ()))
+            closure = frozenset(out)
+            closure = by_direct[direct] = by_closure.setdefault(closure, closure)
+        propagated[gene] = closure
     return propagated
@@ -0,0 +1,314 @@
+"""Permutation-based empirical FDR for ORA results."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from gokit.core.enrichment import OraRunner
+from gokit.core.results import ResultTable
+from gokit.core.stats import hypergeom_tail_arrays
+from gokit.core.vectorized import np, tail_arrays
+
+
+@dataclass
+class NullIndex:
+    """Population annotation in CSR form (gene row -> tested term columns)."""
+
+    pop_n: int
+    indptr: array
+    indices: array
+    pop_counts: array
+    log_factorials: Sequence[float]
+    exact: bool
+    use_numpy: bool
+
+
+def build_null_index(runner: OraRunner, *, namespace_filter: str) -> NullIndex:
+    # Columns are the runner's interned GO ints it tests under the filter; the
+    # interned (sorted) layout keeps every seeded draw identical across processes.
+    annotation = runner.annotation
+    index = NullIndex(
+        pop_n=annotation.n_genes,
+        indptr=annotation.indptr,
+        indices=annotation.indices,
+        pop_counts=annotation.pop_counts,
+        # The runner's one table per run; it reaches each worker with the index.
+        log_factorials=runner.log_factorials,
+        exact=runner.exact,
+        use_numpy=runner._use_numpy,
+    )
+    candidates = runner.candidates(namespace_filter)
+    if len(candidates) == annotation.n_terms:
+        return index
+    column = {t: i for i, t in enumerate(candidates)}
+    index.indptr = array("q", [0])
+    index.indices = array("i")
+    for g in range(annotation.n_genes):
+        index.indices.extend(column[t] for t in annotation.terms_of(g) if t in column)
+        index.indptr.append(len(index.indices))
+    index.pop_counts = array("q", (annotation.pop_counts[t] for t in column))
+    return index
+
+
+def resample_seed(seed: int, key: str, resample: int) -> int:
+    digest = hashlib.sha256(f"{seed}:{key}:{resample}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _tail_arrays(index: NullIndex, study_n: int, pop_count: int):
+    if index.use_numpy and np is not None:
+        return tail_arrays(
+            pop_n=index.pop_n,
+            pop_count=pop_count,
+            study_n=study_n,
+            log_factorials=index.log_factorials,
+        )
+    return hypergeom_tail_arrays(
+        pop_n=index.pop_n,
+        pop_count=pop_count,
+        study_n=study_n,
+        exact=index.exact,
+        log_factorials=index.log_factorials,
+    )
+
+
+def _term_tails(index: NullIndex, study_n: int) -> list:
+    by_size: dict[int, tuple] = {}
+    out = []
+    for pop_count in index.pop_counts:
+        arrays = by_size.get(pop_count)
+        if arrays is None:
+            arrays = _tail_arrays(index, study_n, pop_count)
+            by_size[pop_count] = arrays
+        out.append(arrays)
+    return out
+
+
+def _count_null_hits_python(
+    index: NullIndex,
+    *,
+    study_n: int,
+    test_direction: str,
+    thresholds: list[float],
+    seeds: list[int],
+) -> list[int]:
+    term_tails = _term_tails(index, study_n)
+    expected = [study_n * pop_count / index.pop_n for pop_count in index.pop_counts]
+    indptr = index.indptr
+    indices = index.indices
+    n_terms = len(index.pop_counts)
+    hits = [0] * len(thresholds)
+    for seed in seeds:
+        counts = [0] * n_terms
+        for gene in random.Random(seed).sample(range(index.pop_n), study_n):
+            for term in indices[indptr[gene] : indptr[gene + 1]]:
+                counts[term] += 1
+        null: list[float] = []
+        for term, study_count in enumerate(counts):
+            if test_direction == "over":
+                if study_count <= 0:
+                    continue
+                over = True
+            elif test_direction == "under":
+                over = False
+            else:
+                over = study_count >= expected[term]
+            left, right = term_tails[term]
+            null.append(right[study_count] if over else left[study_count])
+        null.sort()
+        for i, threshold in enumerate(thresholds):
+            hits[i] += bisect_right(null, threshold)
+    return hits
+
+
+def _count_null_hits_numpy(
+    index: NullIndex,
+    *,
+    study_n: int,
+    test_direction: str,
+    thresholds: list[float],
+    seeds: list[int],
+) -> list[int]:
+    # Per-term tails are laid out in one flat buffer so a whole resample is a
+    # bincount over the CSR entries of the drawn genes plus one gather.
+    term_tails = _term_tails(index, study_n)
+    sizes = np.asarray(index.pop_counts, dtype=np.int64)
+    lengths = np.minimum(sizes, study_n) + 1
+    offsets = np.cumsum(lengths) - lengths
+    left_flat = np.concatenate([np.asarray(t[0]) for t in term_tails])
+    right_flat = np.concatenate([np.asarray(t[1]) for t in term_tails])
+    indptr = np.asarray(index.indptr, dtype=np.int64)
+    indices = np.asarray(index.indices, dtype=np.int64)
+    entry_gene = np.repeat(np.arange(index.pop_n), np.diff(indptr))
+    expected = study_n * sizes / index.pop_n
+    cut = np.asarray(thresholds, dtype=np.float64)
+
+    hits = np.zeros(len(thresholds), dtype=np.int64)
+    for seed in seeds:
+        drawn = np.zeros(index.pop_n, dtype=bool)
+        drawn[random.Random(seed).sample(range(index.pop_n), study_n)] = True
+        counts = np.bincount(indices[drawn[entry_gene]], minlength=len(sizes))
+        if test_direction == "over":
+            over = np.ones(len(sizes), dtype=bool)
+        elif test_direction == "under":
+            over = np.zeros(len(sizes), dtype=bool)
+        else:
+            over = counts >= expected
+        pos = offsets + counts
+        null = np.where(over, right_flat[pos], left_flat[pos])
+        if test_direction == "over":
+            null = null[counts > 0]
+        hits += np.searchsorted(np.sort(null), cut, side="right")
+    return hits.tolist()
+
+
+def count_null_hits(
+    index: NullIndex,
+    *,
+    study_n: int,
+    test_direction: str,
+    thresholds: list[float],
+    seeds: list[int],
+) -> list[int]:
+    """Sum over resamples of how many null p-values fall at or below each threshold."""
+    count = (
+        _count_null_hits_numpy if index.use_numpy and np is not None else _count_null_hits_python
+    )
+    return count(
+        index,
+        study_n=study_n,
+        test_direction=test_direction,
+        thresholds=thresholds,
+        seeds=seeds,
+    )
+
+
+_WORKER_INDEX: NullIndex | None = None
+
+
+def _init_worker(index: NullIndex) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+
+
+def _worker_count(study_n: int, test_direction: str, thresholds: list[float], seeds: list[int]):
+    assert _WORKER_INDEX is not None
+    return count_null_hits(
+        _WORKER_INDEX,
+        study_n=study_n,
+        test_direction=test_direction,
+        thresholds=thresholds,
+        seeds=seeds,
+    )
+
+
+class PermutationFdr:
+    """Empirical FDR from random study sets of the same size drawn from the population.
+
+    Every resample has its own seed derived from ``(seed, study key, resample)``,
+    and workers only return integer hit counts, so results are identical for any
+    ``jobs``. The worker pool starts on first use and the CSR index is sent to
+    each worker once, at pool start-up.
+    """
+
+    def __init__(
+        self,
+        runner: OraRunner,
+        *,
+        namespace_filter: str,
+        test_direction: str,
+        seed: int | None = None,
+        jobs: int = 1,
+    ) -> None:
+        self.index = build_null_index(runner, namespace_filter=namespace_filter)
+        self.test_direction = test_direction
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**63)
+        self.jobs = max(int(jobs), 1)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> PermutationFdr:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _null_hits(self, study_n: int, thresholds: list[float], seeds: list[int]) -> list[int]:
+        if self.jobs == 1:
+            return count_null_hits(
+                self.index,
+                study_n=study_n,
+                test_direction=self.test_direction,
+                thresholds=thresholds,
+                seeds=seeds,
+            )
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.jobs,
+                initializer=_init_worker,
+                initargs=(self.index,),
+            )
+        chunks = [seeds[i :: self.jobs] for i in range(self.jobs) if seeds[i :: self.jobs]]
+        hits = [0] * len(thresholds)
+        futures = [
+            self._executor.submit(_worker_count, study_n, self.test_direction, thresholds, chunk)
+            for chunk in chunks
+        ]
+        for future in futures:
+            for i, value in enumerate(future.result()):
+                hits[i] += value
+        return hits
+
+    def estimate(
+        self,
+        pvalues: list[float],
+        *,
+        study_n: int,
+        resamples: int,
+        key: str,
+    ) -> list[float]:
+        """Step-up monotone empirical FDR for each observed p-value."""
+        m = len(pvalues)
+        if m == 0 or resamples <= 0:
+            return [1.0] * m
+        thresholds = sorted(set(pvalues))
+        seeds = [resample_seed(self.seed, key, r) for r in range(resamples)]
+        null_hits = self._null_hits(study_n, thresholds, seeds)
+
+        observed = sorted(pvalues)
+        fdr_at: dict[float, float] = {}
+        running_min = 1.0
+        for threshold, hits in zip(reversed(thresholds), reversed(null_hits), strict=True):
+            n_obs = bisect_right(observed, threshold)
+            raw = (hits / resamples) / n_obs if n_obs else 1.0
+            running_min = min(running_min, raw)
+            fdr_at[threshold] = min(max(running_min, 0.0), 1.0)
+        return [fdr_at[p] for p in pvalues]
+
+    def apply(
+        self,
+        results: ResultTable,
+        *,
+        study_n: int,
+        resamples: int,
+        key: str,
+    ) -> ResultTable:
+        """Replace ``p_adjusted`` with the empirical FDR and restore result ordering."""
+        fdr = self.estimate(
+            list(results.p_uncorrected),
+            study_n=study_n,
+            resamples=resamples,
+            key=key,
+        )
+        results.p_adjusted = array("d", fdr)
+        return results.sort()
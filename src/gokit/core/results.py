@@ -0,0 +1,293 @@
+"""Columnar container for enrichment results."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gokit.core.enrichment import EnrichmentResult
+
+_DIRECTIONS = ("under", "over")
+_INT_COLUMNS = ("study_count", "study_n", "pop_count", "pop_n")
+_FLOAT_COLUMNS = ("p_uncorrected", "p_adjusted")
+
+
+class ResultTable:
+    """Enrichment rows stored column-wise.
+
+    Counts and p-values are typed arrays. GO id, namespace, direction and study
+    id are dictionary-encoded: small integer codes indexing into a shared list
+    of strings (the GO dictionary is the runner's interned ``go_ids``). Item
+    sets are stored sparsely by row. Iterating, or indexing with an int, yields
+    ``EnrichmentResult`` rows for code written against the row API; those rows
+    are copies.
+    """
+
+    def __init__(
+        self,
+        *,
+        go_ids: Sequence[str],
+        namespaces: Sequence[str],
+        go_codes: array,
+        ns_codes: array,
+        over: array,
+        study_count: array,
+        study_n: array,
+        pop_count: array,
+        pop_n: array,
+        p_uncorrected: array,
+        p_adjusted: array,
+        study_ids: Sequence[str] = (),
+        study_codes: array | None = None,
+        study_items: dict[int, set[str]] | None = None,
+        pop_items: dict[int, set[str]] | None = None,
+    ) -> None:
+        self.go_ids = go_ids
+        self.namespaces = namespaces
+        self.go_codes = go_codes
+        self.ns_codes = ns_codes
+        self.over = over
+        self.study_count = study_count
+        self.study_n = study_n
+        self.pop_count = pop_count
+        self.pop_n = pop_n
+        self.p_uncorrected = p_uncorrected
+        self.p_adjusted = p_adjusted
+        self.study_ids = list(study_ids)
+        self.study_codes = study_codes if study_codes is not None else array("i")
+        self.study_items = study_items if study_items is not None else {}
+        self.pop_items = pop_items if pop_items is not None else {}
+        # Row ranges of each study, recorded by ``concat``; reordered tables
+        # leave this empty and ``for_study`` scans ``study_codes`` instead.
+        self.study_spans: dict[str, list[tuple[int, int]]] = {}
+
+    @classmethod
+    def empty(cls, go_ids: Sequence[str] = (), namespaces: Sequence[str] = ()) -> ResultTable:
+        return cls(
+            go_ids=go_ids,
+            namespaces=namespaces,
+            go_codes=array("i"),
+            ns_codes=array("i"),
+            over=array("b"),
+            study_count=array("q"),
+            study_n=array("q"),
+            pop_count=array("q"),
+            pop_n=array("q"),
+            p_uncorrected=array("d"),
+            p_adjusted=array("d"),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[EnrichmentResult]) -> ResultTable:
+        table = cls.empty([], [])
+        go_code: dict[str, int] = {}
+        ns_code: dict[str, int] = {}
+        for i, row in enumerate(rows):
+            table.go_codes.append(go_code.setdefault(row.go_id, len(go_code)))
+            table.ns_codes.append(ns_code.setdefault(row.namespace, len(ns_code)))
+            table.over.append(row.direction == "over")
+            for name in _INT_COLUMNS + _FLOAT_COLUMNS:
+                getattr(table, name).append(getattr(row, name))
+            if row.study_items is not None:
+                table.study_items[i] = row.study_items
+            if row.pop_items is not None:
+                table.pop_items[i] = row.pop_items
+        table.go_ids = list(go_code)
+        table.namespaces = list(ns_code)
+        return table
+
+    @classmethod
+    def concat(cls, parts: Sequence[tuple[str, ResultTable]]) -> ResultTable:
+        """Stack per-study tables into one table with a ``study_id`` column."""
+        if not parts:
+            return cls.empty()
+        first = parts[0][1]
+        same = all(t.go_ids is first.go_ids and t.namespaces is first.namespaces for _, t in parts)
+        out = cls.empty(first.go_ids, first.namespaces) if same else cls.empty([], [])
+        go_code = {} if same else {g: i for i, g in enumerate(out.go_ids)}
+        ns_code = {} if same else {n: i for i, n in enumerate(out.namespaces)}
+        study_code: dict[str, int] = {}
+        for study_id, table in parts:
+            offset = len(out)
+            if same:
+                out.go_codes.extend(table.go_codes)
+                out.ns_codes.extend(table.ns_codes)
+            else:
+                out.go_codes.extend(
+                    go_code.setdefault(table.go_ids[c], len(go_code)) for c in table.go_codes
+                )
+                out.ns_codes.extend(
+                    ns_code.setdefault(table.namespaces[c], len(ns_code)) for c in table.ns_codes
+                )
+            out.over.extend(table.over)
+            for name in _INT_COLUMNS + _FLOAT_COLUMNS:
+                getattr(out, name).extend(getattr(table, name))
+            code = study_code.setdefault(study_id, len(study_code))
+            out.study_codes.extend([code] * len(table))
+            out.study_spans.setdefault(study_id, []).append((offset, len(out)))
+            out.study_items.update((offset + i, s) for i, s in table.study_items.items())
+            out.pop_items.update((offset + i, s) for i, s in table.pop_items.items())
+        if not same:
+            out.go_ids = list(go_code)
+            out.namespaces = list(ns_code)
+        out.study_ids = list(study_code)
+        return out
+
+    def __len__(self) -> int:
+        return len(self.p_adjusted)
+
+    def row(self, i: int) -> EnrichmentResult:
+        from gokit.core.enrichment import EnrichmentResult
+
+        return EnrichmentResult(
+            go_id=self.go_ids[self.go_codes[i]],
+            namespace=self.namespaces[self.ns_codes[i]],
+            direction=_DIRECTIONS[self.over[i]],
+            study_count=self.study_count[i],
+            study_n=self.study_n[i],
+            pop_count=self.pop_count[i],
+            pop_n=self.pop_n[i],
+            p_uncorrected=self.p_uncorrected[i],
+            p_adjusted=self.p_adjusted[i],
+            study_items=self.study_items.get(i),
+            pop_items=self.pop_items.get(i),
+        )
+
+    def __iter__(self) -> Iterator[EnrichmentResult]:
+        return (self.row(i) for i in range(len(self)))
+
+    def __getitem__(self, key: int | slice):
+        if isinstance(key, slice):
+            return self.take(range(len(self))[key])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("ResultTable index out of range")
+        return self.row(key)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ResultTable, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultTable(rows={len(self)}, studies={len(self.study_ids)})"
+
+    def go_id_column(self) -> list[str]:
+        go_ids = self.go_ids
+        return [go_ids[c] for c in self.go_codes]
+
+    def namespace_column(self) -> list[str]:
+        namespaces = self.namespaces
+        return [namespaces[c] for c in self.ns_codes]
+
+    def direction_column(self) -> list[str]:
+        return [_DIRECTIONS[o] for o in self.over]
+
+    def study_id_column(self) -> list[str]:
+        study_ids = self.study_ids
+        return [study_ids[c] for c in self.study_codes]
+
+    def take(self, order: Sequence[int]) -> ResultTable:
+        """New table with rows ``order`` (sharing the string dictionaries)."""
+        position = (
+            {old: new for new, old in enumerate(order)}
+            if self.study_items or self.pop_items
+            else {}
+        )
+
+        def pick(column: array) -> array:
+            return array(column.typecode, map(column.__getitem__, order))
+
+        return ResultTable(
+            go_ids=self.go_ids,
+            namespaces=self.namespaces,
+            go_codes=pick(self.go_codes),
+            ns_codes=pick(self.ns_codes),
+            over=pick(self.over),
+            **{name: pick(getattr(self, name)) for name in _INT_COLUMNS + _FLOAT_COLUMNS},
+            study_ids=self.study_ids,
+            study_codes=pick(self.study_codes) if self.study_codes else None,
+            study_items={position[i]: s for i, s in self.study_items.items() if i in position},
+            pop_items={position[i]: s for i, s in self.pop_items.items() if i in position},
+        )
+
+    def sort(self) -> ResultTable:
+        """Sort in place by (p_adjusted, p_uncorrected, direction, go_id)."""
+        go_ids = self.go_ids
+        order = sorted(
+            range(len(self)),
+            key=lambda i: (
+                self.p_adjusted[i],
+                self.p_uncorrected[i],
+                _DIRECTIONS[self.over[i]],
+                go_ids[self.go_codes[i]],
+            ),
+        )
+        self.__dict__.update(self.take(order).__dict__)
+        return self
+
+    def for_study(self, study_id: str) -> ResultTable:
+        """Rows of one study from a ``concat`` table, as a single-study table."""
+        if self.study_spans:
+            spans = self.study_spans.get(study_id, [])
+            order = [i for lo, hi in spans for i in range(lo, hi)]
+        else:
+            code = self.study_ids.index(study_id) if study_id in self.study_ids else -1
+            order = [i for i, c in enumerate(self.study_codes) if c == code]
+        table = self.take(order)
+        table.study_ids = []
+        table.study_codes = array("i")
+        return table
+
+    def to_arrow(self, *, dictionary: bool = True):
+        """Arrow table whose numeric columns wrap the typed-array buffers without copying.
+
+        String columns are dictionary-encoded, or plain strings with
+        ``dictionary=False``.
+        """
+        from gokit.report.parquet_writer import _require_pyarrow
+
+        pa, _ = _require_pyarrow()
+
+        def numeric(values: array, kind):
+            return pa.Array.from_buffers(kind, len(values), [None, pa.py_buffer(values)])
+
+        def encoded(codes: array, kind, values: Sequence[str]):
+            if not dictionary:
+                return pa.array([values[c] for c in codes], type=pa.string())
+            return pa.DictionaryArray.from_arrays(
+                numeric(codes, kind), pa.array(list(values), type=pa.string())
+            )
+
+        columns = {}
+        if self.study_codes:
+            columns["study_id"] = encoded(self.study_codes, pa.int32(), self.study_ids)
+        columns["go_id"] = encoded(self.go_codes, pa.int32(), self.go_ids)
+        columns["namespace"] = encoded(self.ns_codes, pa.int32(), self.namespaces)
+        columns["direction"] = encoded(self.over, pa.int8(), _DIRECTIONS)
+        for name in _INT_COLUMNS:
+            columns[name] = numeric(getattr(self, name), pa.int64())
+        for name in _FLOAT_COLUMNS:
+            columns[name] = numeric(getattr(self, name), pa.float64())
+        return pa.table(columns)
+
+
+def as_table(results: ResultTable | Iterable[EnrichmentResult]) -> ResultTable:
+    return results if isinstance(results, ResultTable) else ResultTable.from_rows(results)
+
+
+def as_combined_table(
+    rows: ResultTable | Iterable[tuple[str, EnrichmentResult]],
+) -> ResultTable:
+    """Coerce legacy ``(study_id, row)`` pairs into a ``concat``-style table."""
+    if isinstance(rows, ResultTable):
+        return rows
+    pairs = list(rows)
+    table = ResultTable.from_rows(row for _, row in pairs)
+    table.study_ids = list(dict.fromkeys(study_id for study_id, _ in pairs))
+    code = {study_id: i for i, study_id in enumerate(table.study_ids)}
+    table.study_codes = array("i", (code[study_id] for study_id, _ in pairs))
+    return table
@@ -8,7 +8,7 @@ from math import log
 SemanticMetric = str
 
 
-@dataclass
+@dataclass(slots=True)
 class StudyTermSet:
     study_id: str
     go_ids: set[str]
@@ -21,7 +21,7 @@ def _expanded_terms(go_ids: set[str], go_to_ancestors: dict[str, set[str]]) -> s
     return expanded
 
 
-@dataclass
+@dataclass(slots=True)
 class PairwiseSemanticSummary:
     study_a: str
     study_b: str
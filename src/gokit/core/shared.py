@@ -0,0 +1,182 @@
+"""Export/attach an ``OraRunner``'s array-backed state via shared memory."""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+from gokit.core.enrichment import OraRunner
+from gokit.core.interning import AnnotationIndex
+
+_ARRAYS = (
+    ("indptr", "q"),
+    ("indices", "i"),
+    ("pop_counts", "q"),
+    ("log_factorials", "d"),
+    # Derived once by the owner so workers attach instead of rebuilding them.
+    ("term_class", "i"),
+    ("term_indptr", "q"),
+    ("term_genes", "i"),
+)
+
+
+@dataclass(frozen=True)
+class SharedRunnerHandle:
+    """Picklable description of shared blocks; only names and sizes travel to workers."""
+
+    blocks: dict[str, tuple[str, str, int]]
+    strings: tuple[str, int]
+    exact: bool
+    backend: str
+    pvalue_cache_bytes: int
+    min_term_size: int = 1
+    max_term_size: int | None = None
+    n_term_classes: int = 0
+
+
+class SharedRunnerExport:
+    """Owner of the shared blocks; unlinks them on ``close()`` or context exit."""
+
+    def __init__(self, handle: SharedRunnerHandle, segments: list[shared_memory.SharedMemory]):
+        self.handle = handle
+        self._segments = segments
+
+    @property
+    def nbytes(self) -> int:
+        return sum(seg.size for seg in self._segments)
+
+    def __enter__(self) -> SharedRunnerHandle:
+        return self.handle
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for seg in self._segments:
+            seg.close()
+            seg.unlink()
+        self._segments = []
+
+
+class CsrGeneToGo(Mapping):
+    """Read-only ``gene -> frozenset(GO ids)`` view decoded from the CSR arrays."""
+
+    def __init__(self, index: AnnotationIndex) -> None:
+        self._index = index
+
+    def __getitem__(self, gene: str) -> frozenset[str]:
+        g = self._index.gene_index[gene]
+        go_ids = self._index.go_ids
+        return frozenset(go_ids[t] for t in self._index.terms_of(g))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.gene_ids)
+
+    def __len__(self) -> int:
+        return self._index.n_genes
+
+
+def _create(data: bytes | memoryview) -> shared_memory.SharedMemory:
+    # Zero-size segments are not allowed on every platform.
+    seg = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    seg.buf[: len(data)] = data
+    return seg
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def export_runner(runner: OraRunner) -> SharedRunnerExport:
+    index = runner.annotation
+    term_indptr, term_genes = index.inverse()
+    sources = {
+        "indptr": index.indptr,
+        "indices": index.indices,
+        "pop_counts": index.pop_counts,
+        "log_factorials": runner.log_factorials,
+        "term_class": runner._term_class,
+        "term_indptr": term_indptr,
+        "term_genes": term_genes,
+    }
+    segments: list[shared_memory.SharedMemory] = []
+    blocks: dict[str, tuple[str, str, int]] = {}
+    for key, fmt in _ARRAYS:
+        data = memoryview(sources[key]).cast("B")
+        seg = _create(data)
+        segments.append(seg)
+        blocks[key] = (seg.name, fmt, len(data))
+    strings = json.dumps(
+        {
+            "genes": index.gene_ids,
+            "terms": index.go_ids,
+            "namespaces": [runner.go_to_namespace.get(g) for g in index.go_ids],
+        }
+    ).encode("utf-8")
+    seg = _create(strings)
+    segments.append(seg)
+    handle = SharedRunnerHandle(
+        blocks=blocks,
+        strings=(seg.name, len(strings)),
+        exact=runner.exact,
+        # The resolved engine, so attached runners reproduce the owner's p-values.
+        backend="numpy" if runner._use_numpy else "python",
+        pvalue_cache_bytes=runner.pvalue_cache.max_bytes,
+        min_term_size=runner.min_term_size,
+        max_term_size=runner.max_term_size,
+        n_term_classes=runner.n_term_classes,
+    )
+    return SharedRunnerExport(handle, segments)
+
+
+def attach_runner(handle: SharedRunnerHandle) -> OraRunner:
+    segments: list[shared_memory.SharedMemory] = []
+    views: dict[str, memoryview] = {}
+    for key, (name, fmt, nbytes) in handle.blocks.items():
+        seg = _attach(name)
+        segments.append(seg)
+        views[key] = seg.buf[:nbytes].toreadonly().cast(fmt)
+    name, nbytes = handle.strings
+    seg = _attach(name)
+    tables = json.loads(bytes(seg.buf[:nbytes]).decode("utf-8"))
+    seg.close()
+
+    gene_ids = tables["genes"]
+    go_ids = tables["terms"]
+    index = AnnotationIndex(
+        gene_ids=gene_ids,
+        go_ids=go_ids,
+        gene_index={gene: i for i, gene in enumerate(gene_ids)},
+        go_index={goid: i for i, goid in enumerate(go_ids)},
+        indptr=views["indptr"],
+        indices=views["indices"],
+        pop_counts=views["pop_counts"],
+    )
+    index._by_term = (views["term_indptr"], views["term_genes"])
+    runner = OraRunner.__new__(OraRunner)
+    runner._setup(
+        annotation=index,
+        population_genes=set(gene_ids),
+        gene_to_go=CsrGeneToGo(index),
+        go_to_namespace={
+            goid: sys.intern(ns)
+            for goid, ns in zip(go_ids, tables["namespaces"], strict=True)
+            if ns
+        },
+        log_factorials=views["log_factorials"],
+        exact=handle.exact,
+        backend=handle.backend,
+        pvalue_cache_bytes=handle.pvalue_cache_bytes,
+        min_term_size=handle.min_term_size,
+        max_term_size=handle.max_term_size,
+        term_classes=(views["term_class"], handle.n_term_classes),
+    )
+    # The segments must outlive every view into them.
+    runner._shared_segments = segments
+    return runner
@@ -2,7 +2,24 @@
 
 from __future__ import annotations
 
-from math import comb
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from math import comb, exp, inf, lgamma, log
+
+# The log-space engine agrees with the exact big-integer path to within this
+# relative tolerance (populations up to ~100k genes); see tests/test_core_stats.py.
+LOGSPACE_RTOL = 1e-9
+
+# Stop summing once the remaining terms are decreasing and below this fraction
+# of the running total; the neglected tail is then below double precision.
+_TAIL_EPS = 1e-17
+_RESCALE_AT = 1e280
+
+
+def log_factorial_table(n: int) -> array:
+    """Contiguous ``log(k!)`` for k = 0..n, shared by every test against one population."""
+    return array("d", (lgamma(k + 1) for k in range(max(n, 0) + 1)))
 
 
 def _hypergeom_pmf(*, pop_n: int, pop_count: int, study_n: int, k: int) -> float:
@@ -14,7 +31,124 @@ def _hypergeom_pmf(*, pop_n: int, pop_count: int, study_n: int, k: int) -> float
     return (left * right) / denom
 
 
-def fisher_right_tail(*, pop_n: int, pop_count: int, study_n: int, study_count: int) -> float:
+def _log_hypergeom_pmf(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    k: int,
+    log_factorials: Sequence[float] | None = None,
+) -> float:
+    if k < 0 or k > pop_count or study_n - k < 0 or study_n - k > pop_n - pop_count:
+        return -inf
+    lf = log_factorials
+    if lf is not None:
+        return (
+            lf[pop_count]
+            - lf[k]
+            - lf[pop_count - k]
+            + lf[pop_n - pop_count]
+            - lf[study_n - k]
+            - lf[pop_n - pop_count - study_n + k]
+            - lf[pop_n]
+            + lf[study_n]
+            + lf[pop_n - study_n]
+        )
+    return (
+        lgamma(pop_count + 1)
+        - lgamma(k + 1)
+        - lgamma(pop_count - k + 1)
+        + lgamma(pop_n - pop_count + 1)
+        - lgamma(study_n - k + 1)
+        - lgamma(pop_n - pop_count - study_n + k + 1)
+        - lgamma(pop_n + 1)
+        + lgamma(study_n + 1)
+        + lgamma(pop_n - study_n + 1)
+    )
+
+
+def _right_tail_logspace(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    study_count: int,
+    log_factorials: Sequence[float] | None,
+) -> float:
+    # Sum pmf(k) for k >= study_count relative to the first term, stepping with
+    # the ratio pmf(k + 1) / pmf(k) instead of re-evaluating each pmf.
+    max_k = min(pop_count, study_n)
+    other = pop_n - pop_count - study_n
+    log_head = _log_hypergeom_pmf(
+        pop_n=pop_n,
+        pop_count=pop_count,
+        study_n=study_n,
+        k=study_count,
+        log_factorials=log_factorials,
+    )
+    term = 1.0
+    total = 1.0
+    for k in range(study_count, max_k):
+        ratio = ((pop_count - k) * (study_n - k)) / ((k + 1) * (other + k + 1))
+        term *= ratio
+        total += term
+        if ratio < 1.0 and term < total * _TAIL_EPS:
+            break
+        if total > _RESCALE_AT:
+            log_head += log(total)
+            term /= total
+            total = 1.0
+    return exp(log_head + log(total))
+
+
+def _left_tail_logspace(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    study_count: int,
+    min_k: int,
+    log_factorials: Sequence[float] | None,
+) -> float:
+    # Mirror of the right tail: walk down from study_count with pmf(k - 1) / pmf(k).
+    other = pop_n - pop_count - study_n
+    log_head = _log_hypergeom_pmf(
+        pop_n=pop_n,
+        pop_count=pop_count,
+        study_n=study_n,
+        k=study_count,
+        log_factorials=log_factorials,
+    )
+    term = 1.0
+    total = 1.0
+    for k in range(study_count, min_k, -1):
+        ratio = (k * (other + k)) / ((pop_count - k + 1) * (study_n - k + 1))
+        term *= ratio
+        total += term
+        if ratio < 1.0 and term < total * _TAIL_EPS:
+            break
+        if total > _RESCALE_AT:
+            log_head += log(total)
+            term /= total
+            total = 1.0
+    return exp(log_head + log(total))
+
+
+def fisher_right_tail(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    study_count: int,
+    exact: bool = False,
+    log_factorials: Sequence[float] | None = None,
+) -> float:
+    """P(X >= study_count) for a hypergeometric draw.
+
+    The default log-space engine matches ``exact=True`` (exact big-integer
+    binomials) to within ``LOGSPACE_RTOL``. ``log_factorials`` is an optional
+    ``log_factorial_table(n)`` with ``n >= pop_n`` used instead of ``lgamma``.
+    """
     if pop_n <= 0 or study_n <= 0:
         return 1.0
     if pop_count <= 0 or study_count <= 0:
@@ -24,13 +158,35 @@ def fisher_right_tail(*, pop_n: int, pop_count: int, study_n: int, study_count:
     if study_count > max_k:
         return 1.0
 
+    if not exact:
+        min_k = max(0, study_n - (pop_n - pop_count))
+        if study_count <= min_k:
+            return 1.0
+        p = _right_tail_logspace(
+            pop_n=pop_n,
+            pop_count=pop_count,
+            study_n=study_n,
+            study_count=study_count,
+            log_factorials=log_factorials,
+        )
+        return min(max(p, 0.0), 1.0)
+
     p = 0.0
     for k in range(study_count, max_k + 1):
         p += _hypergeom_pmf(pop_n=pop_n, pop_count=pop_count, study_n=study_n, k=k)
     return min(max(p, 0.0), 1.0)
 
 
-def fisher_left_tail(*, pop_n: int, pop_count: int, study_n: int, study_count: int) -> float:
+def fisher_left_tail(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    study_count: int,
+    exact: bool = False,
+    log_factorials: Sequence[float] | None = None,
+) -> float:
+    """P(X <= study_count) for a hypergeometric draw; see ``fisher_right_tail``."""
     if pop_n <= 0 or study_n <= 0:
         return 1.0
     if pop_count <= 0:
@@ -43,22 +199,153 @@ def fisher_left_tail(*, pop_n: int, pop_count: int, study_n: int, study_count: i
     if study_count >= max_k:
         return 1.0
 
+    if not exact:
+        p = _left_tail_logspace(
+            pop_n=pop_n,
+            pop_count=pop_count,
+            study_n=study_n,
+            study_count=study_count,
+            min_k=min_k,
+            log_factorials=log_factorials,
+        )
+        return min(max(p, 0.0), 1.0)
+
     p = 0.0
     for k in range(min_k, study_count + 1):
         p += _hypergeom_pmf(pop_n=pop_n, pop_count=pop_count, study_n=study_n, k=k)
     return min(max(p, 0.0), 1.0)
 
 
-def bh_adjust(pvalues: list[float]) -> list[float]:
-    m = len(pvalues)
-    if m == 0:
+def hypergeom_tail_arrays(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    exact: bool = False,
+    log_factorials: Sequence[float] | None = None,
+) -> tuple[array, array]:
+    """Both cumulative tails for every attainable study count of one term size.
+
+    Returns ``(left, right)`` indexed by k = 0..min(pop_count, study_n), where
+    ``left[k] == fisher_left_tail(..., study_count=k)`` and
+    ``right[k] == fisher_right_tail(..., study_count=k)`` (within ``LOGSPACE_RTOL``).
+    """
+    max_k = max(min(pop_count, study_n), 0)
+    left = array("d", [1.0]) * (max_k + 1)
+    right = array("d", [1.0]) * (max_k + 1)
+    if pop_n <= 0 or study_n <= 0 or pop_count <= 0:
+        return left, right
+
+    min_k = max(0, study_n - (pop_n - pop_count))
+    other = pop_n - pop_count - study_n
+    if exact:
+        weights: list = []
+        c_in = comb(pop_count, min_k)
+        c_out = comb(pop_n - pop_count, study_n - min_k)
+        for k in range(min_k, max_k + 1):
+            weights.append(c_in * c_out)
+            c_in = c_in * (pop_count - k) // (k + 1)
+            c_out = c_out * (study_n - k) // (other + k + 1)
+        total = comb(pop_n, study_n)
+
+        def finish(acc) -> float:
+            return _clip01(acc / total)
+
+    else:
+        # pmf relative to the mode, walking outwards with the pmf ratios; terms that
+        # underflow relative to the mode are below double precision of any tail.
+        mode = (study_n + 1) * (pop_count + 1) // (pop_n + 2)
+        mode = min(max(mode, min_k), max_k)
+        weights = [0.0] * (max_k - min_k + 1)
+        weights[mode - min_k] = 1.0
+        w = 1.0
+        for k in range(mode, max_k):
+            w *= ((pop_count - k) * (study_n - k)) / ((k + 1) * (other + k + 1))
+            if w == 0.0:
+                break
+            weights[k + 1 - min_k] = w
+        w = 1.0
+        for k in range(mode, min_k, -1):
+            w *= (k * (other + k)) / ((pop_count - k + 1) * (study_n - k + 1))
+            if w == 0.0:
+                break
+            weights[k - 1 - min_k] = w
+        scale = exp(
+            _log_hypergeom_pmf(
+                pop_n=pop_n,
+                pop_count=pop_count,
+                study_n=study_n,
+                k=mode,
+                log_factorials=log_factorials,
+            )
+        )
+
+        def finish(acc) -> float:
+            return _clip01(acc * scale)
+
+    running = 0
+    for k in range(min_k):
+        left[k] = 0.0
+    for k in range(min_k, max_k):
+        running += weights[k - min_k]
+        left[k] = finish(running)
+    running = 0
+    for k in range(max_k, min_k, -1):
+        running += weights[k - min_k]
+        right[k] = finish(running)
+    return left, right
+
+
+def min_attainable_pvalue(
+    *,
+    pop_n: int,
+    pop_count: int,
+    study_n: int,
+    log_factorials: Sequence[float] | None = None,
+) -> float:
+    """Smallest over-representation p-value any study of ``study_n`` genes can give.
+
+    The right tail at the largest possible overlap ``min(pop_count, study_n)``
+    is a single hypergeometric term.
+    """
+    k = min(pop_count, study_n)
+    return exp(
+        _log_hypergeom_pmf(
+            pop_n=pop_n,
+            pop_count=pop_count,
+            study_n=study_n,
+            k=k,
+            log_factorials=log_factorials,
+        )
+    )
+
+
+def tarone_threshold(min_pvalues: Sequence[float], alpha: float) -> int:
+    """Tarone's ``m``: the smallest m with at most m hypotheses reaching ``alpha / m``.
+
+    Hypotheses whose minimum attainable p-value exceeds ``alpha / m`` can never
+    be significant and are dropped; the rest are corrected as m tests.
+    """
+    ps = sorted(min_pvalues)
+    count = len(ps)
+    for m in range(1, len(ps) + 1):
+        while count and ps[count - 1] > alpha / m:
+            count -= 1
+        if count <= m:
+            return m
+    return 1
+
+
+def bh_adjust(pvalues: list[float], n_tests: int | None = None) -> list[float]:
+    if not pvalues:
         return []
+    m = n_tests or len(pvalues)
 
     ranked = sorted(enumerate(pvalues), key=lambda x: x[1])
-    adjusted = [1.0] * m
+    adjusted = [1.0] * len(pvalues)
     running_min = 1.0
 
-    for rank in range(m, 0, -1):
+    for rank in range(len(pvalues), 0, -1):
         idx, pval = ranked[rank - 1]
         raw = (pval * m) / rank
         running_min = min(running_min, raw)
@@ -71,20 +358,20 @@ def _clip01(p: float) -> float:
     return min(max(p, 0.0), 1.0)
 
 
-def bonferroni_adjust(pvalues: list[float]) -> list[float]:
-    m = len(pvalues)
-    if m == 0:
+def bonferroni_adjust(pvalues: list[float], n_tests: int | None = None) -> list[float]:
+    if not pvalues:
         return []
+    m = n_tests or len(pvalues)
     return [_clip01(p * m) for p in pvalues]
 
 
-def holm_adjust(pvalues: list[float]) -> list[float]:
-    m = len(pvalues)
-    if m == 0:
+def holm_adjust(pvalues: list[float], n_tests: int | None = None) -> list[float]:
+    if not pvalues:
         return []
+    m = n_tests or len(pvalues)
 
     ranked = sorted(enumerate(pvalues), key=lambda x: x[1])
-    adjusted = [1.0] * m
+    adjusted = [1.0] * len(pvalues)
     running_max = 0.0
     for rank, (idx, pval) in enumerate(ranked, start=1):
         raw = (m - rank + 1) * pval
@@ -93,15 +380,15 @@ def holm_adjust(pvalues: list[float]) -> list[float]:
     return adjusted
 
 
-def by_adjust(pvalues: list[float]) -> list[float]:
-    m = len(pvalues)
-    if m == 0:
+def by_adjust(pvalues: list[float], n_tests: int | None = None) -> list[float]:
+    if not pvalues:
         return []
+    m = n_tests or len(pvalues)
     c_m = sum(1.0 / k for k in range(1, m + 1))
     ranked = sorted(enumerate(pvalues), key=lambda x: x[1])
-    adjusted = [1.0] * m
+    adjusted = [1.0] * len(pvalues)
     running_min = 1.0
-    for rank in range(m, 0, -1):
+    for rank in range(len(pvalues), 0, -1):
         idx, pval = ranked[rank - 1]
         raw = (pval * m * c_m) / rank
         running_min = min(running_min, raw)
@@ -109,16 +396,86 @@ def by_adjust(pvalues: list[float]) -> list[float]:
     return adjusted
 
 
-def adjust_pvalues(pvalues: list[float], method: str) -> list[float]:
+def adjust_pvalues(
+    pvalues: list[float], method: str, n_tests: int | None = None
+) -> list[float]:
+    """Correct ``pvalues``; ``n_tests`` overrides the hypothesis count (default: all given)."""
     m = method.lower()
     if m == "fdr_bh":
-        return bh_adjust(pvalues)
+        return bh_adjust(pvalues, n_tests)
     if m == "fdr_by":
-        return by_adjust(pvalues)
+        return by_adjust(pvalues, n_tests)
     if m == "bonferroni":
-        return bonferroni_adjust(pvalues)
+        return bonferroni_adjust(pvalues, n_tests)
     if m == "holm":
-        return holm_adjust(pvalues)
+        return holm_adjust(pvalues, n_tests)
     if m in {"none", "raw"}:
         return [_clip01(p) for p in pvalues]
     raise ValueError(f"Unsupported multiple-testing method: {method}")
+
+
+class PValueCache:
+    """Bounded LRU of per-term-size tail arrays shared across studies.
+
+    Entries are ``hypergeom_tail_arrays`` results keyed by
+    ``(pop_n, study_n, pop_count)``, so every term of that size in any study
+    with that ``study_n`` is answered by indexing. Hits and misses count term
+    lookups; the byte cap bounds the stored arrays (zero disables caching).
+    """
+
+    ENTRY_OVERHEAD_BYTES = 280
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max(int(max_bytes), 0)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[int, int, int], tuple[Sequence[float], Sequence[float]]]
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @classmethod
+    def _entry_bytes(cls, arrays: tuple[Sequence[float], Sequence[float]]) -> int:
+        return cls.ENTRY_OVERHEAD_BYTES + 8 * (len(arrays[0]) + len(arrays[1]))
+
+    def get(
+        self, key: tuple[int, int, int], n_terms: int = 1
+    ) -> tuple[Sequence[float], Sequence[float]] | None:
+        arrays = self._data.get(key)
+        if arrays is None:
+            self.misses += n_terms
+            return None
+        self.hits += n_terms
+        self._data.move_to_end(key)
+        return arrays
+
+    def put(
+        self, key: tuple[int, int, int], arrays: tuple[Sequence[float], Sequence[float]]
+    ) -> None:
+        size = self._entry_bytes(arrays)
+        if size > self.max_bytes:
+            return
+        if key in self._data:
+            self.nbytes -= self._entry_bytes(self._data.pop(key))
+        self._data[key] = arrays
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.nbytes -= self._entry_bytes(evicted)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"pvalue_cache_hits={self.hits}; "
+            f"pvalue_cache_misses={self.misses}; "
+            f"pvalue_cache_hit_rate={self.hit_rate:.4f}; "
+            f"pvalue_cache_entries={len(self)}; "
+            f"pvalue_cache_bytes={self.nbytes}; "
+            f"pvalue_cache_max_bytes={self.max_bytes}"
+        )
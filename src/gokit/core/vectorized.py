@@ -0,0 +1,121 @@
+"""Optional NumPy kernels for batched ORA p-values."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from math import exp
+
+from gokit.core.stats import _log_hypergeom_pmf
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - environment dependent
+    np = None
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError(
+            "The vectorized backend requires optional dependency 'numpy'. "
+            "Install with: pip install 'gokit[fast]'"
+        )
+    return np
+
+
+def tail_arrays(*, pop_n: int, pop_count: int, study_n: int, log_factorials):
+    """Vectorized ``hypergeom_tail_arrays``: both tails for k = 0..min(pop_count, study_n).
+
+    Same arithmetic in the same order as the python engine (pmf ratios walked
+    out from the mode with sequential products, then sequential sums), so both
+    backends return identical floats.
+    """
+    max_k = max(min(pop_count, study_n), 0)
+    left = np.ones(max_k + 1, dtype=np.float64)
+    right = np.ones(max_k + 1, dtype=np.float64)
+    if pop_n <= 0 or study_n <= 0 or pop_count <= 0:
+        return left, right
+
+    min_k = max(0, study_n - (pop_n - pop_count))
+    other = pop_n - pop_count - study_n
+    mode = min(max((study_n + 1) * (pop_count + 1) // (pop_n + 2), min_k), max_k)
+    weights = np.empty(max_k - min_k + 1, dtype=np.float64)
+    weights[mode - min_k] = 1.0
+    k = np.arange(mode, max_k, dtype=np.int64)
+    up = ((pop_count - k) * (study_n - k)) / ((k + 1) * (other + k + 1))
+    weights[mode - min_k + 1 :] = np.multiply.accumulate(up)
+    k = np.arange(mode, min_k, -1, dtype=np.int64)
+    down = (k * (other + k)) / ((pop_count - k + 1) * (study_n - k + 1))
+    weights[: mode - min_k][::-1] = np.multiply.accumulate(down)
+    scale = exp(
+        _log_hypergeom_pmf(
+            pop_n=pop_n,
+            pop_count=pop_count,
+            study_n=study_n,
+            k=mode,
+            log_factorials=log_factorials,
+        )
+    )
+    left[:min_k] = 0.0
+    left[min_k:max_k] = np.add.accumulate(weights)[:-1] * scale
+    right[min_k + 1 :] = np.add.accumulate(weights[::-1])[::-1][1:] * scale
+    return np.clip(left, 0.0, 1.0), np.clip(right, 0.0, 1.0)
+
+
+def grouped_tail_lookup(*, pop_counts, study_counts, is_over, arrays_for):
+    """Index per-term-size tail arrays for all terms, one vectorized gather per size.
+
+    ``arrays_for(pop_count, n_terms)`` returns the ``(left, right)`` arrays.
+    """
+    pop_count = np.asarray(pop_counts, dtype=np.int64)
+    study_count = np.asarray(study_counts, dtype=np.int64)
+    is_over = np.asarray(is_over, dtype=bool)
+    p = np.empty(len(pop_count), dtype=np.float64)
+    if not len(pop_count):
+        return p
+    order = np.argsort(pop_count, kind="stable")
+    sizes, starts = np.unique(pop_count[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    for size, lo, hi in zip(sizes.tolist(), bounds[:-1], bounds[1:], strict=True):
+        sel = order[lo:hi]
+        left, right = arrays_for(size, hi - lo)
+        ks = study_count[sel]
+        p[sel] = np.where(is_over[sel], right[ks], left[ks])
+    return p
+
+
+def choose_over(
+    *,
+    pop_n: int,
+    study_n: int,
+    pop_counts: Sequence[int],
+    study_counts: Sequence[int],
+    test_direction: str,
+):
+    """Boolean mask of terms tested for over-representation (vs. under)."""
+    require_numpy()
+    pop_count = np.asarray(pop_counts, dtype=np.int64)
+    study_count = np.asarray(study_counts, dtype=np.int64)
+    if test_direction == "over":
+        return np.ones(len(pop_count), dtype=bool)
+    if test_direction == "under":
+        return np.zeros(len(pop_count), dtype=bool)
+    expected = (study_n * pop_count / pop_n) if pop_n > 0 else np.zeros(len(pop_count))
+    return study_count >= expected
+
+
+def bh_adjust_array(pvalues, n_tests: int | None = None):
+    """``stats.bh_adjust`` over an array, with the same arithmetic and tie order."""
+    p = np.asarray(pvalues, dtype=np.float64)
+    if not len(p):
+        return p
+    m = n_tests or len(p)
+    order = np.argsort(p, kind="stable")
+    raw = p[order] * m / np.arange(1, len(p) + 1)
+    running = np.minimum(np.minimum.accumulate(raw[::-1])[::-1], 1.0)
+    out = np.empty_like(p)
+    out[order] = np.clip(running, 0.0, 1.0)
+    return out
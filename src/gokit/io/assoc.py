@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Callable
 from pathlib import Path
 
 _GO_RE = re.compile(r"GO:\d{7}")
@@ -48,7 +49,7 @@ def _extract_goids(tokens: list[str]) -> set[str]:
     return goids
 
 
-def read_id2gos(path: Path) -> dict[str, set[str]]:
+def read_id2gos(path: Path, keep: Callable[[str], bool] | None = None) -> dict[str, set[str]]:
     assoc: dict[str, set[str]] = {}
     with path.open("r", encoding="utf-8") as handle:
         for raw in handle:
@@ -59,6 +60,8 @@ def read_id2gos(path: Path) -> dict[str, set[str]]:
             if len(parts) < 2:
                 continue
             gene = parts[0]
+            if keep is not None and not keep(gene):
+                continue
             goids = _extract_goids(parts[1:])
             if not goids:
                 continue
@@ -66,7 +69,7 @@ def read_id2gos(path: Path) -> dict[str, set[str]]:
     return assoc
 
 
-def read_gaf(path: Path) -> dict[str, set[str]]:
+def read_gaf(path: Path, keep: Callable[[str], bool] | None = None) -> dict[str, set[str]]:
     """Read GAF 2.x format using DB Object ID as gene key."""
     assoc: dict[str, set[str]] = {}
     with path.open("r", encoding="utf-8") as handle:
@@ -80,11 +83,13 @@ def read_gaf(path: Path) -> dict[str, set[str]]:
             goid = parts[4].strip()
             if not gene or not _GO_RE.fullmatch(goid):
                 continue
+            if keep is not None and not keep(gene):
+                continue
             assoc.setdefault(gene, set()).add(goid)
     return assoc
 
 
-def read_gpad(path: Path) -> dict[str, set[str]]:
+def read_gpad(path: Path, keep: Callable[[str], bool] | None = None) -> dict[str, set[str]]:
     """Read GPAD 1.x/2.x format using DB Object ID as gene key."""
     assoc: dict[str, set[str]] = {}
     with path.open("r", encoding="utf-8") as handle:
@@ -98,11 +103,13 @@ def read_gpad(path: Path) -> dict[str, set[str]]:
             goid = parts[3].strip()
             if not gene or not _GO_RE.fullmatch(goid):
                 continue
+            if keep is not None and not keep(gene):
+                continue
             assoc.setdefault(gene, set()).add(goid)
     return assoc
 
 
-def read_gene2go(path: Path) -> dict[str, set[str]]:
+def read_gene2go(path: Path, keep: Callable[[str], bool] | None = None) -> dict[str, set[str]]:
     """Read NCBI gene2go format using GeneID as gene key."""
     assoc: dict[str, set[str]] = {}
     with path.open("r", encoding="utf-8") as handle:
@@ -117,21 +124,26 @@ def read_gene2go(path: Path) -> dict[str, set[str]]:
             goid = parts[2].strip()
             if not gene or not _GO_RE.fullmatch(goid):
                 continue
+            if keep is not None and not keep(gene):
+                continue
             assoc.setdefault(gene, set()).add(goid)
     return assoc
 
 
-def read_associations(path: Path, assoc_format: str) -> dict[str, set[str]]:
+def read_associations(
+    path: Path, assoc_format: str, keep: Callable[[str], bool] | None = None
+) -> dict[str, set[str]]:
+    """Gene -> direct GO ids; genes for which ``keep`` returns False are skipped."""
     fmt = _detect_assoc_format(path) if assoc_format == "auto" else assoc_format
 
     if fmt == "id2gos":
-        return read_id2gos(path)
+        return read_id2gos(path, keep)
     if fmt == "gaf":
-        return read_gaf(path)
+        return read_gaf(path, keep)
     if fmt == "gpad":
-        return read_gpad(path)
+        return read_gpad(path, keep)
     if fmt == "gene2go":
-        return read_gene2go(path)
+        return read_gene2go(path, keep)
 
     raise UnsupportedAssociationFormatError(
         f"Association format '{assoc_format}' is not implemented."
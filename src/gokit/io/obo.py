@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -12,15 +13,23 @@ class OboMeta:
     data_version: str | None
 
 
-def read_obo_graph(path: Path) -> tuple[dict[str, str], dict[str, set[str]], OboMeta]:
+def read_obo_graph(
+    path: Path,
+) -> tuple[dict[str, str], dict[str, set[str]], dict[str, dict[str, set[str]]], OboMeta]:
+    """Namespaces, ``is_a`` parents and typed ``relationship:`` parents per term.
+
+    The relationship map is ``{relationship: {child: parents}}``; only GO targets are kept.
+    """
     go_to_namespace: dict[str, str] = {}
     go_to_parents: dict[str, set[str]] = {}
+    go_to_relationships: dict[str, dict[str, set[str]]] = {}
     format_version: str | None = None
     data_version: str | None = None
 
     current_go: str | None = None
     current_ns: str | None = None
     current_parents: set[str] = set()
+    current_related: list[tuple[str, str]] = []
     in_term = False
 
     def finalize_term() -> None:
@@ -29,6 +38,8 @@ def read_obo_graph(path: Path) -> tuple[dict[str, str], dict[str, set[str]], Obo
             if current_ns:
                 go_to_namespace[current_go] = current_ns
             go_to_parents[current_go] = set(current_parents)
+            for rel, parent in current_related:
+                go_to_relationships.setdefault(rel, {}).setdefault(current_go, set()).add(parent)
 
     with path.open("r", encoding="utf-8") as handle:
         for raw in handle:
@@ -39,6 +50,7 @@ def read_obo_graph(path: Path) -> tuple[dict[str, str], dict[str, set[str]], Obo
                 current_go = None
                 current_ns = None
                 current_parents = set()
+                current_related = []
                 in_term = False
                 continue
 
@@ -55,6 +67,7 @@ def read_obo_graph(path: Path) -> tuple[dict[str, str], dict[str, set[str]], Obo
                 current_go = None
                 current_ns = None
                 current_parents = set()
+                current_related = []
                 in_term = True
                 continue
 
@@ -64,18 +77,25 @@ def read_obo_graph(path: Path) -> tuple[dict[str, str], dict[str, set[str]], Obo
             if line.startswith("id: GO:"):
                 current_go = line.split(": ", 1)[1].strip()
             elif line.startswith("namespace:"):
-                current_ns = line.split(": ", 1)[1].strip()
+                current_ns = sys.intern(line.split(": ", 1)[1].strip())
             elif line.startswith("is_a: GO:"):
                 current_parents.add(line.split()[1])
+            elif line.startswith("relationship:"):
+                parts = line.split()
+                if len(parts) >= 3 and parts[2].startswith("GO:"):
+                    current_related.append((sys.intern(parts[1]), parts[2]))
 
     if in_term:
         finalize_term()
 
-    return go_to_namespace, go_to_parents, OboMeta(
-        format_version=format_version, data_version=data_version
+    return (
+        go_to_namespace,
+        go_to_parents,
+        go_to_relationships,
+        OboMeta(format_version=format_version, data_version=data_version),
     )
 
 
 def read_obo_namespace_map(path: Path) -> tuple[dict[str, str], OboMeta]:
-    go_to_namespace, _, meta = read_obo_graph(path)
+    go_to_namespace, _, _, meta = read_obo_graph(path)
     return go_to_namespace, meta
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from math import isfinite
 from pathlib import Path
 
 
@@ -16,6 +17,52 @@ def read_gene_set(path: Path) -> set[str]:
     return genes
 
 
+def read_ranked_genes(path: Path) -> list[str]:
+    """Read a ranked gene list (best first), one gene per line.
+
+    Only the first tab-separated column is used, so score columns may follow.
+    Repeated genes keep their first rank.
+    """
+    genes: dict[str, None] = {}
+    with path.open("r", encoding="utf-8") as handle:
+        for raw in handle:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            gene = line.split("\t", 1)[0].strip()
+            if gene:
+                genes.setdefault(gene, None)
+    return list(genes)
+
+
+def read_gene_scores(path: Path) -> dict[str, float]:
+    """Read ``<gene>\\t<score>`` lines; a non-numeric first line is taken as a header.
+
+    Any later non-numeric or non-finite score is an error.
+    """
+    scores: dict[str, float] = {}
+    first = True
+    with path.open("r", encoding="utf-8") as handle:
+        for lineno, raw in enumerate(handle, start=1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            is_first, first = first, False
+            parts = line.split("\t")
+            if len(parts) < 2:
+                raise ValueError(f"{path}:{lineno}: expected '<gene>\\t<score>'")
+            try:
+                score = float(parts[1])
+            except ValueError:
+                if is_first:
+                    continue
+                raise ValueError(f"{path}:{lineno}: score is not a number: {parts[1]!r}") from None
+            if not isfinite(score):
+                raise ValueError(f"{path}:{lineno}: score is not finite: {parts[1]!r}")
+            scores.setdefault(parts[0].strip(), score)
+    return scores
+
+
 def read_study_manifest(path: Path) -> list[tuple[str, Path]]:
     """Read study manifest lines as either:
     - <study_name>\\t<study_path>
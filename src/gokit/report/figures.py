@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import csv
 import math
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class PlotRow:
     go_id: str
     namespace: str
@@ -40,17 +41,17 @@ def read_enrichment_tsv(path: Path) -> list[PlotRow]:
             namespace = _pick(raw, "NS", "namespace")
             if not go_id or not namespace:
                 continue
-            direction = _pick(raw, "direction") or "over"
+            direction = sys.intern(_pick(raw, "direction") or "over")
             p_adj_raw = _pick(raw, "p_adjusted")
             if not p_adj_raw:
                 continue
             rows.append(
                 PlotRow(
                     go_id=go_id,
-                    namespace=namespace,
+                    namespace=sys.intern(namespace),
                     direction=direction,
                     p_adjusted=float(p_adj_raw),
-                    study_id=_pick(raw, "study_id") or None,
+                    study_id=sys.intern(_pick(raw, "study_id")) or None,
                 )
             )
     return rows
@@ -3,101 +3,98 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
 from pathlib import Path
 
 from gokit.core.enrichment import EnrichmentResult
+from gokit.core.results import ResultTable, as_combined_table, as_table
 from gokit.core.semantic import PairwiseSemanticSummary
 
 
-def write_tsv(path: Path, results: list[EnrichmentResult]) -> None:
+def _row_fields(table: ResultTable) -> Iterator[tuple[int, list[str]]]:
+    go_ids = table.go_id_column()
+    namespaces = table.namespace_column()
+    directions = table.direction_column()
+    for i in range(len(table)):
+        yield i, [
+            go_ids[i],
+            namespaces[i],
+            directions[i],
+            str(table.study_count[i]),
+            str(table.study_n[i]),
+            str(table.pop_count[i]),
+            str(table.pop_n[i]),
+            f"{table.p_uncorrected[i]:.6g}",
+            f"{table.p_adjusted[i]:.6g}",
+        ]
+
+
+def _row_payloads(table: ResultTable) -> Iterator[tuple[int, dict[str, object]]]:
+    go_ids = table.go_id_column()
+    namespaces = table.namespace_column()
+    directions = table.direction_column()
+    for i in range(len(table)):
+        yield i, {
+            "go_id": go_ids[i],
+            "namespace": namespaces[i],
+            "direction": directions[i],
+            "study_count": table.study_count[i],
+            "study_n": table.study_n[i],
+            "pop_count": table.pop_count[i],
+            "pop_n": table.pop_n[i],
+            "p_uncorrected": table.p_uncorrected[i],
+            "p_adjusted": table.p_adjusted[i],
+        }
+
+
+def write_tsv(path: Path, results: ResultTable | list[EnrichmentResult]) -> None:
+    table = as_table(results)
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
         handle.write(
             "GO\tNS\tdirection\tstudy_count\tstudy_n\tpop_count\tpop_n\tp_uncorrected\tp_adjusted\n"
         )
-        for row in results:
-            handle.write(
-                "\t".join(
-                    [
-                        row.go_id,
-                        row.namespace,
-                        row.direction,
-                        str(row.study_count),
-                        str(row.study_n),
-                        str(row.pop_count),
-                        str(row.pop_n),
-                        f"{row.p_uncorrected:.6g}",
-                        f"{row.p_adjusted:.6g}",
-                    ]
-                )
-                + "\n"
-            )
+        for _, fields in _row_fields(table):
+            handle.write("\t".join(fields) + "\n")
 
 
-def write_jsonl(path: Path, results: list[EnrichmentResult]) -> None:
+def write_jsonl(path: Path, results: ResultTable | list[EnrichmentResult]) -> None:
+    table = as_table(results)
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
-        for row in results:
-            payload = {
-                "go_id": row.go_id,
-                "namespace": row.namespace,
-                "direction": row.direction,
-                "study_count": row.study_count,
-                "study_n": row.study_n,
-                "pop_count": row.pop_count,
-                "pop_n": row.pop_n,
-                "p_uncorrected": row.p_uncorrected,
-                "p_adjusted": row.p_adjusted,
-            }
-            if row.study_items is not None:
-                payload["study_items"] = sorted(row.study_items)
-            if row.pop_items is not None:
-                payload["pop_items"] = sorted(row.pop_items)
+        for i, payload in _row_payloads(table):
+            if i in table.study_items:
+                payload["study_items"] = sorted(table.study_items[i])
+            if i in table.pop_items:
+                payload["pop_items"] = sorted(table.pop_items[i])
             handle.write(json.dumps(payload, sort_keys=True) + "\n")
 
 
-def write_combined_tsv(path: Path, rows: list[tuple[str, EnrichmentResult]]) -> None:
+def write_combined_tsv(
+    path: Path,
+    rows: ResultTable | list[tuple[str, EnrichmentResult]],
+) -> None:
+    table = as_combined_table(rows)
+    study_ids = table.study_id_column()
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
         handle.write(
             "study_id\tGO\tNS\tdirection\tstudy_count\tstudy_n\tpop_count\tpop_n\tp_uncorrected\tp_adjusted\n"
         )
-        for study_id, row in rows:
-            handle.write(
-                "\t".join(
-                    [
-                        study_id,
-                        row.go_id,
-                        row.namespace,
-                        row.direction,
-                        str(row.study_count),
-                        str(row.study_n),
-                        str(row.pop_count),
-                        str(row.pop_n),
-                        f"{row.p_uncorrected:.6g}",
-                        f"{row.p_adjusted:.6g}",
-                    ]
-                )
-                + "\n"
-            )
+        for i, fields in _row_fields(table):
+            handle.write(study_ids[i] + "\t" + "\t".join(fields) + "\n")
 
 
-def write_combined_jsonl(path: Path, rows: list[tuple[str, EnrichmentResult]]) -> None:
+def write_combined_jsonl(
+    path: Path,
+    rows: ResultTable | list[tuple[str, EnrichmentResult]],
+) -> None:
+    table = as_combined_table(rows)
+    study_ids = table.study_id_column()
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
-        for study_id, row in rows:
-            payload = {
-                "study_id": study_id,
-                "go_id": row.go_id,
-                "namespace": row.namespace,
-                "direction": row.direction,
-                "study_count": row.study_count,
-                "study_n": row.study_n,
-                "pop_count": row.pop_count,
-                "pop_n": row.pop_n,
-                "p_uncorrected": row.p_uncorrected,
-                "p_adjusted": row.p_adjusted,
-            }
+        for i, payload in _row_payloads(table):
+            payload["study_id"] = study_ids[i]
             handle.write(json.dumps(payload, sort_keys=True) + "\n")
 
 
@@ -148,10 +145,25 @@ def write_semantic_pair_summary(path: Path, rows: list[PairwiseSemanticSummary])
             )
 
 
-def write_grouped_summary_single(path: Path, results: list[EnrichmentResult], alpha: float) -> None:
-    by_ns: dict[str, list[EnrichmentResult]] = {}
-    for row in results:
-        by_ns.setdefault(row.namespace, []).append(row)
+def _summary_counts(table: ResultTable, rows: list[int], alpha: float) -> str:
+    over = sum(1 for i in rows if table.over[i])
+    sig = [i for i in rows if table.p_adjusted[i] <= alpha]
+    over_sig = sum(1 for i in sig if table.over[i])
+    return (
+        f"{len(rows)}\t{over}\t{len(rows) - over}\t"
+        f"{len(sig)}\t{over_sig}\t{len(sig) - over_sig}\t{alpha}\n"
+    )
+
+
+def write_grouped_summary_single(
+    path: Path,
+    results: ResultTable | list[EnrichmentResult],
+    alpha: float,
+) -> None:
+    table = as_table(results)
+    by_ns: dict[str, list[int]] = {}
+    for i, ns in enumerate(table.namespace_column()):
+        by_ns.setdefault(ns, []).append(i)
 
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
@@ -160,26 +172,18 @@ def write_grouped_summary_single(path: Path, results: list[EnrichmentResult], al
             "significant_terms\tover_significant_terms\tunder_significant_terms\talpha\n"
         )
         for ns in sorted(by_ns):
-            rows = by_ns[ns]
-            sig = sum(1 for r in rows if r.p_adjusted <= alpha)
-            over = sum(1 for r in rows if r.direction == "over")
-            under = sum(1 for r in rows if r.direction == "under")
-            over_sig = sum(1 for r in rows if r.direction == "over" and r.p_adjusted <= alpha)
-            under_sig = sum(1 for r in rows if r.direction == "under" and r.p_adjusted <= alpha)
-            handle.write(
-                f"{ns}\t{len(rows)}\t{over}\t{under}\t"
-                f"{sig}\t{over_sig}\t{under_sig}\t{alpha}\n"
-            )
+            handle.write(f"{ns}\t{_summary_counts(table, by_ns[ns], alpha)}")
 
 
 def write_grouped_summary_batch(
     path: Path,
-    rows: list[tuple[str, EnrichmentResult]],
+    rows: ResultTable | list[tuple[str, EnrichmentResult]],
     alpha: float,
 ) -> None:
-    grouped: dict[tuple[str, str], list[EnrichmentResult]] = {}
-    for study_id, row in rows:
-        grouped.setdefault((study_id, row.namespace), []).append(row)
+    table = as_combined_table(rows)
+    grouped: dict[tuple[str, str], list[int]] = {}
+    for i, key in enumerate(zip(table.study_id_column(), table.namespace_column(), strict=True)):
+        grouped.setdefault(key, []).append(i)
 
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
@@ -187,14 +191,6 @@ def write_grouped_summary_batch(
             "study_id\tnamespace\ttotal_terms\tover_terms\tunder_terms\t"
             "significant_terms\tover_significant_terms\tunder_significant_terms\talpha\n"
         )
-        for (study_id, ns) in sorted(grouped):
-            vals = grouped[(study_id, ns)]
-            sig = sum(1 for r in vals if r.p_adjusted <= alpha)
-            over = sum(1 for r in vals if r.direction == "over")
-            under = sum(1 for r in vals if r.direction == "under")
-            over_sig = sum(1 for r in vals if r.direction == "over" and r.p_adjusted <= alpha)
-            under_sig = sum(1 for r in vals if r.direction == "under" and r.p_adjusted <= alpha)
-            handle.write(
-                f"{study_id}\t{ns}\t{len(vals)}\t{over}\t{under}\t"
-                f"{sig}\t{over_sig}\t{under_sig}\t{alpha}\n"
-            )
+        for study_id, ns in sorted(grouped):
+            counts = _summary_counts(table, grouped[(study_id, ns)], alpha)
+            handle.write(f"{study_id}\t{ns}\t{counts}")
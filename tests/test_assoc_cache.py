@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from gokit.cache.assoc_cache import load_or_build_assoc_cache
+
+
+def _load(tmp_path: Path, *, id_type: str = "auto", propagate: bool = True):
+    return load_or_build_assoc_cache(
+        assoc_path=tmp_path / "assoc.txt",
+        assoc_format="id2gos",
+        obo_path=tmp_path / "go.obo",
+        go_to_ancestors={"GO:0000002": {"GO:0000001"}},
+        id_type=id_type,
+        propagate=propagate,
+        population_path=tmp_path / "pop.txt",
+        population_genes={"g1", "g2"},
+        cache_dir=tmp_path / "cache",
+    )
+
+
+def _write_inputs(tmp_path: Path, assoc: str) -> None:
+    (tmp_path / "assoc.txt").write_text(assoc, encoding="utf-8")
+    (tmp_path / "go.obo").write_text("format-version: 1.2\n", encoding="utf-8")
+    (tmp_path / "pop.txt").write_text("g1\ng2\n", encoding="utf-8")
+
+
+def test_assoc_cache_hit_round_trips_propagated_mapping(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\ng2\tGO:0000001;GO:0000003\n")
+
+    first = _load(tmp_path)
+    second = _load(tmp_path)
+
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert second.gene_to_go == first.gene_to_go
+    assert second.gene_to_go["g1"] == {"GO:0000001", "GO:0000002"}
+    assert second.id_mode == first.id_mode
+
+
+def test_assoc_cache_invalidation_by_content_and_settings(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\n")
+    base = _load(tmp_path)
+
+    assert _load(tmp_path, propagate=False).cache_path != base.cache_path
+    assert _load(tmp_path, id_type="str").cache_path != base.cache_path
+
+    (tmp_path / "assoc.txt").write_text("g1\tGO:0000001\n", encoding="utf-8")
+    changed = _load(tmp_path)
+    assert changed.cache_hit is False
+    assert changed.gene_to_go == {"g1": {"GO:0000001"}}
+
+
+def test_assoc_cache_rebuilds_unreadable_entry(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\n")
+    first = _load(tmp_path)
+    first.cache_path.write_bytes(b"garbage")
+
+    again = _load(tmp_path)
+    assert again.cache_hit is False
+    assert again.gene_to_go == first.gene_to_go
+
+
+def test_assoc_cache_rebuilds_truncated_entry(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\ng2\tGO:0000001;GO:0000003\n")
+    first = _load(tmp_path)
+    data = first.cache_path.read_bytes()
+    header_end = data.index(b"}", data.index(b'"terms"')) + 1
+
+    # Cuts into the indices, into the indptr, right after the header and mid-magic.
+    for size in (len(data) - 4, header_end + 8, header_end, 5):
+        first.cache_path.write_bytes(data[:size])
+        again = _load(tmp_path)
+        assert again.cache_hit is False
+        assert again.gene_to_go == first.gene_to_go
+
+
+def test_assoc_cache_hit_shares_identical_rows(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\ng2\tGO:0000002\n")
+    _load(tmp_path)
+    hit = _load(tmp_path)
+
+    assert hit.cache_hit is True
+    assert hit.gene_to_go["g1"] is hit.gene_to_go["g2"]
+
+
+def test_assoc_cache_drops_genes_outside_population(tmp_path: Path) -> None:
+    _write_inputs(tmp_path, "g1\tGO:0000002\nx9\tGO:0000002\ng2\tGO:0000003\nx8\tGO:0000001\n")
+    first = _load(tmp_path)
+    hit = _load(tmp_path)
+
+    assert set(first.gene_to_go) == {"g1", "g2"}
+    assert first.dropped_genes == hit.dropped_genes == 2
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from gokit.core.idnorm import PopulationFilter
 from gokit.io.assoc import read_associations
 
 
@@ -89,3 +90,16 @@ def test_read_id2gos_semicolon_go_list(tmp_path: Path) -> None:
     assoc = read_associations(assoc_txt, "id2gos")
     assert assoc["geneA"] == {"GO:0008150", "GO:0003674"}
     assert assoc["geneB"] == {"GO:0005575"}
+
+
+def test_population_filter_pushdown(tmp_path: Path) -> None:
+    gene2go = tmp_path / "gene2go"
+    _write(
+        gene2go,
+        "#tax_id\tGeneID\tGO_ID\n9606\t101\tGO:0000001\n9606\t102\tGO:0000002\n"
+        "10090\t900\tGO:0000001\n10090\t900\tGO:0000002\n",
+    )
+    keep = PopulationFilter({"0101", "102"}, "auto")
+    assoc = read_associations(gene2go, "gene2go", keep)
+    assert assoc == {"101": {"GO:0000001"}, "102": {"GO:0000002"}}
+    assert keep.dropped == 1
@@ -96,3 +96,33 @@ def test_batch_mode_and_semantic_output(tmp_path: Path) -> None:
     matrix = (out_dir / "semantic_similarity.tsv").read_text(encoding="utf-8")
     assert "study_a" in matrix
     assert "study_b" in matrix
+
+
+def test_ranked_sweep_matches_single_study_runs(tmp_path: Path) -> None:
+    pop = tmp_path / "population.txt"
+    assoc = tmp_path / "assoc.txt"
+    obo = tmp_path / "go-basic.obo"
+    ranked = tmp_path / "ranked.tsv"
+    _write(pop, "".join(f"gene{i}\n" for i in range(1, 9)))
+    _write(assoc, "".join(f"gene{i} GO:000000{1 + i % 3}\n" for i in range(1, 9)))
+    terms = (f"[Term]\nid: GO:000000{i}\nnamespace: biological_process\n\n" for i in (1, 2, 3))
+    _write(obo, "format-version: 1.2\n\n" + "".join(terms))
+    _write(ranked, "# gene\tscore\ngene3\t9.1\ngene6\t8.0\ngene3\t7.5\ngene1\t2.0\ngene8\t1.0\n")
+    common = ["--population", str(pop), "--assoc", str(assoc), "--assoc-format", "id2gos"]
+    common += ["--obo", str(obo), "--out-formats", "tsv"]
+
+    out_dir = tmp_path / "sweep"
+    rc = main(
+        ["enrich", "--ranked", str(ranked), "--cutoffs", "3,1", "--out", str(out_dir), *common]
+    )
+    assert rc == 0
+    notes = (out_dir.with_suffix(".manifest.json")).read_text(encoding="utf-8")
+    assert "ranked_cutoffs=1,3" in notes
+
+    for cutoff, genes in ((1, "gene3\n"), (3, "gene3\ngene6\ngene1\n")):
+        study = tmp_path / f"top{cutoff}.txt"
+        _write(study, genes)
+        single = tmp_path / f"single{cutoff}"
+        assert main(["enrich", "--study", str(study), "--out", str(single), *common]) == 0
+        expected = single.with_suffix(".tsv").read_bytes()
+        assert (out_dir / "studies" / f"top_{cutoff}.tsv").read_bytes() == expected
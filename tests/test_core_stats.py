@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-from gokit.core.stats import adjust_pvalues, bh_adjust, fisher_left_tail, fisher_right_tail
+from gokit.core.stats import (
+    LOGSPACE_RTOL,
+    PValueCache,
+    adjust_pvalues,
+    bh_adjust,
+    fisher_left_tail,
+    fisher_right_tail,
+    hypergeom_tail_arrays,
+    log_factorial_table,
+    min_attainable_pvalue,
+    tarone_threshold,
+)
 
 
 def test_fisher_right_tail_basic_range() -> None:
@@ -23,6 +34,44 @@ def test_fisher_left_tail_bounds() -> None:
     assert fisher_left_tail(pop_n=10, pop_count=0, study_n=5, study_count=0) == 1.0
 
 
+def test_logspace_tails_match_exact_path() -> None:
+    cases = [
+        (100, 20, 10, 5),
+        (2000, 40, 300, 0),
+        (2000, 40, 300, 6),
+        (2000, 1990, 300, 295),
+        (20000, 300, 2000, 50),
+        (20000, 7, 400, 7),
+    ]
+    for pop_n, pop_count, study_n, study_count in cases:
+        for tail in (fisher_right_tail, fisher_left_tail):
+            kwargs = {
+                "pop_n": pop_n,
+                "pop_count": pop_count,
+                "study_n": study_n,
+                "study_count": study_count,
+            }
+            fast = tail(**kwargs)
+            exact = tail(**kwargs, exact=True)
+            assert abs(fast - exact) <= LOGSPACE_RTOL * exact
+
+
+def test_logspace_tails_complement() -> None:
+    kwargs = {"pop_n": 500, "pop_count": 60, "study_n": 80}
+    right = fisher_right_tail(**kwargs, study_count=11)
+    left = fisher_left_tail(**kwargs, study_count=10)
+    assert abs((right + left) - 1.0) < 1e-12
+
+
+def test_log_factorial_table_drives_tails() -> None:
+    table = log_factorial_table(500)
+    assert len(table) == 501
+    assert table[0] == 0.0
+    kwargs = {"pop_n": 500, "pop_count": 60, "study_n": 80, "study_count": 14}
+    assert fisher_right_tail(**kwargs, log_factorials=table) == fisher_right_tail(**kwargs)
+    assert fisher_left_tail(**kwargs, log_factorials=table) == fisher_left_tail(**kwargs)
+
+
 def test_bh_adjust_monotonic_bounds() -> None:
     vals = [0.01, 0.2, 0.03, 0.5]
     adj = bh_adjust(vals)
@@ -56,3 +105,65 @@ def test_adjust_pvalues_rejects_unknown_method() -> None:
         pass
     else:
         raise AssertionError("Expected ValueError for unsupported method")
+
+
+def test_tail_arrays_match_scalar_tails() -> None:
+    kwargs = {"pop_n": 300, "pop_count": 40, "study_n": 60}
+    for exact in (False, True):
+        left, right = hypergeom_tail_arrays(**kwargs, exact=exact)
+        assert len(left) == len(right) == 41
+        for k in range(41):
+            want_left = fisher_left_tail(**kwargs, study_count=k, exact=True)
+            want_right = fisher_right_tail(**kwargs, study_count=k, exact=True)
+            assert abs(left[k] - want_left) <= LOGSPACE_RTOL * want_left
+            assert abs(right[k] - want_right) <= LOGSPACE_RTOL * want_right
+
+
+def test_tail_arrays_respect_support_bounds() -> None:
+    # study_n exceeds the genes outside the term, so k < 2 is impossible.
+    left, right = hypergeom_tail_arrays(pop_n=10, pop_count=6, study_n=6)
+    assert left[0] == left[1] == 0.0
+    assert right[0] == right[1] == right[2] == 1.0
+    assert left[6] == 1.0
+
+
+def test_pvalue_cache_lru_bounds_and_stats() -> None:
+    arrays = hypergeom_tail_arrays(pop_n=20, pop_count=4, study_n=5)
+    size = PValueCache.ENTRY_OVERHEAD_BYTES + 8 * 2 * len(arrays[0])
+    cache = PValueCache(max_bytes=2 * size)
+
+    assert cache.get((20, 5, 4), n_terms=3) is None
+    cache.put((20, 5, 4), arrays)
+    cache.put((20, 6, 4), arrays)
+    assert cache.get((20, 5, 4), n_terms=2) is arrays
+    cache.put((20, 7, 4), arrays)
+
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * size
+    assert cache.get((20, 6, 4)) is None
+    assert cache.hits == 2
+    assert cache.misses == 4
+
+
+def test_pvalue_cache_zero_cap_disables() -> None:
+    cache = PValueCache(max_bytes=0)
+    cache.put((20, 5, 4), hypergeom_tail_arrays(pop_n=20, pop_count=4, study_n=5))
+    assert len(cache) == 0
+
+
+def test_min_attainable_pvalue_is_tail_at_full_overlap() -> None:
+    for pop_count, study_n in [(3, 10), (10, 3), (7, 7)]:
+        expected = fisher_right_tail(
+            pop_n=50, pop_count=pop_count, study_n=study_n, study_count=min(pop_count, study_n)
+        )
+        got = min_attainable_pvalue(pop_n=50, pop_count=pop_count, study_n=study_n)
+        assert abs(got - expected) <= LOGSPACE_RTOL * expected
+
+
+def test_tarone_threshold_counts_only_testable_hypotheses() -> None:
+    assert tarone_threshold([], 0.05) == 1
+    assert tarone_threshold([1e-6, 0.5, 0.5, 0.5], 0.05) == 1
+    # Two strong hypotheses reach 0.05 / 2; the weak ones never do.
+    assert tarone_threshold([1e-6, 1e-6, 0.04, 0.5], 0.05) == 2
+    assert tarone_threshold([1e-6] * 5, 0.05) == 5
+    assert adjust_pvalues([0.01, 0.02], "bonferroni", n_tests=4) == [0.04, 0.08]
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from gokit.cli.main import main
 
 
@@ -9,7 +11,12 @@ def _read(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def test_golden_single_outputs(tmp_path: Path) -> None:
+# "auto" picks the numpy engine when it is installed; both must match byte for byte.
+BACKENDS = pytest.mark.parametrize("backend", ["python", "auto"])
+
+
+@BACKENDS
+def test_golden_single_outputs(tmp_path: Path, backend: str) -> None:
     root = Path("tests/golden/single")
     inp = root / "input"
     exp = root / "expected"
@@ -36,6 +43,8 @@ def test_golden_single_outputs(tmp_path: Path) -> None:
             str(out_prefix),
             "--out-formats",
             "tsv,jsonl",
+            "--backend",
+            backend,
         ]
     )
     assert rc == 0
@@ -45,7 +54,8 @@ def test_golden_single_outputs(tmp_path: Path) -> None:
     assert _read(out_prefix.with_suffix(".summary.tsv")) == _read(exp / "goea.summary.tsv")
 
 
-def test_golden_batch_outputs(tmp_path: Path) -> None:
+@BACKENDS
+def test_golden_batch_outputs(tmp_path: Path, backend: str) -> None:
     root = Path("tests/golden/batch")
     inp = root / "input"
     exp = root / "expected"
@@ -72,6 +82,8 @@ def test_golden_batch_outputs(tmp_path: Path) -> None:
             str(out_dir),
             "--out-formats",
             "tsv,jsonl",
+            "--backend",
+            backend,
             "--compare-semantic",
             "--semantic-metric",
             "jaccard",
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import json
+import mmap
+import weakref
 from pathlib import Path
 
-from gokit.cache.obo_cache import load_or_build_obo_cache
+import pytest
+
+from gokit.cache import obo_cache
+from gokit.cache.csr import CsrSetMap, read_sections
+from gokit.cache.obo_cache import _compute_ancestors, load_or_build_obo_cache
 
 
 def _obo_text(version: str) -> str:
@@ -48,3 +55,219 @@ def test_obo_cache_invalidation_by_content(tmp_path: Path) -> None:
 
     assert second.cache_hit is False
     assert first.cache_path != second.cache_path
+
+
+def _obo_with_relationships() -> str:
+    return "\n".join(
+        [
+            "format-version: 1.2",
+            "",
+            "[Term]",
+            "id: GO:0000001",
+            "namespace: biological_process",
+            "",
+            "[Term]",
+            "id: GO:0000002",
+            "namespace: biological_process",
+            "",
+            "[Term]",
+            "id: GO:0000003",
+            "namespace: biological_process",
+            "is_a: GO:0000001 ! parent",
+            "relationship: part_of GO:0000002 ! whole",
+            "relationship: part_of UBERON:0000001 ! external",
+            "",
+            "[Term]",
+            "id: GO:0000004",
+            "namespace: biological_process",
+            "relationship: regulates GO:0000003 ! target",
+            "",
+        ]
+    )
+
+
+def test_obo_cache_relationship_closures(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_with_relationships(), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    plain = load_or_build_obo_cache(obo, cache_dir)
+    assert plain.propagation_ancestors is plain.go_to_ancestors
+    assert plain.go_to_relationships["part_of"] == {"GO:0000003": {"GO:0000002"}}
+    assert plain.go_to_ancestors["GO:0000004"] == set()
+
+    both = load_or_build_obo_cache(obo, cache_dir, ["regulates", "part_of"])
+    assert both.cache_hit is True
+    assert both.propagation_ancestors["GO:0000004"] == {"GO:0000001", "GO:0000002", "GO:0000003"}
+    assert both.go_to_ancestors == plain.go_to_ancestors
+
+    header, _ = read_sections(both.cache_path, b"GOKITOBO\n")
+    assert header["closures"] == ["part_of,regulates"]
+    again = load_or_build_obo_cache(obo, cache_dir, ["part_of", "regulates"])
+    assert again.propagation_ancestors == both.propagation_ancestors
+
+    with pytest.raises(ValueError, match="has_part"):
+        load_or_build_obo_cache(obo, cache_dir, ["has_part"])
+
+
+def test_obo_cache_hit_decodes_sets_lazily(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_with_relationships(), encoding="utf-8")
+    built = load_or_build_obo_cache(obo, tmp_path / "cache", ["part_of"])
+    hit = load_or_build_obo_cache(obo, tmp_path / "cache", ["part_of"])
+
+    assert isinstance(hit.go_to_ancestors, CsrSetMap)
+    assert not hit.go_to_ancestors._decoded
+    assert hit.go_to_ancestors["GO:0000003"] == {"GO:0000001"}
+    assert len(hit.go_to_ancestors._decoded) == 1
+    assert hit.go_to_ancestors.get("GO:9999999") is None
+    assert hit.go_to_namespace == built.go_to_namespace
+    assert dict(hit.go_to_parents) == built.go_to_parents
+    assert dict(hit.propagation_ancestors) == built.propagation_ancestors
+    assert {rel: dict(m) for rel, m in hit.go_to_relationships.items()} == (
+        built.go_to_relationships
+    )
+
+
+def _write_json_cache(cache_dir: Path, obo: Path, payload: dict[str, object]) -> Path:
+    bin_path = load_or_build_obo_cache(obo, cache_dir).cache_path
+    bin_path.unlink()
+    json_path = bin_path.with_suffix(".json")
+    json_path.write_text(json.dumps({"data_version": "from-json", **payload}), encoding="utf-8")
+    return json_path
+
+
+def test_obo_cache_migrates_json_payload(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_text("v1"), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    json_path = _write_json_cache(
+        cache_dir,
+        obo,
+        {
+            "schema_version": 2,
+            "go_to_namespace": {"GO:0000001": "biological_process"},
+            "go_to_parents": {"GO:0000001": []},
+            "go_to_ancestors": {"GO:0000001": []},
+            "go_to_relationships": {},
+            "relationship_closures": {},
+        },
+    )
+
+    migrated = load_or_build_obo_cache(obo, cache_dir)
+    assert migrated.cache_hit is True
+    assert migrated.meta.data_version == "from-json"
+    assert migrated.cache_path.exists()
+    assert not json_path.exists()
+    assert load_or_build_obo_cache(obo, cache_dir).meta.data_version == "from-json"
+
+
+def test_obo_cache_migrates_released_schema_1_json(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_with_relationships(), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    schema_1 = {
+        "schema_version": 1,
+        "go_to_namespace": {"GO:0000003": "biological_process"},
+        "go_to_parents": {"GO:0000003": ["GO:0000001"]},
+        "go_to_ancestors": {"GO:0000003": ["GO:0000001"]},
+    }
+    json_path = _write_json_cache(cache_dir, obo, schema_1)
+
+    migrated = load_or_build_obo_cache(obo, cache_dir)
+    assert migrated.cache_hit is True
+    assert migrated.meta.data_version == "from-json"
+    assert migrated.go_to_ancestors == {"GO:0000003": {"GO:0000001"}}
+    assert not json_path.exists()
+
+    # Schema 1 never stored typed edges, so a relationship run reparses the OBO.
+    _write_json_cache(cache_dir, obo, schema_1)
+    with_rel = load_or_build_obo_cache(obo, cache_dir, ["part_of"])
+    assert with_rel.cache_hit is False
+    assert with_rel.propagation_ancestors["GO:0000003"] == {"GO:0000001", "GO:0000002"}
+    again = load_or_build_obo_cache(obo, cache_dir, ["part_of"])
+    assert again.cache_hit is True
+    assert "part_of" in again.go_to_relationships
+
+
+def test_obo_cache_reparses_corrupt_json(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_text("v1"), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    json_path = _write_json_cache(cache_dir, obo, {"schema_version": 2})
+
+    for text in ('{"schema_version": 2, "go_to', "[]", '{"schema_version": 2}'):
+        json_path.write_text(text, encoding="utf-8")
+        rebuilt = load_or_build_obo_cache(obo, cache_dir)
+        assert rebuilt.cache_hit is False
+        assert rebuilt.meta.data_version == "v1"
+        assert not json_path.exists()
+        rebuilt.cache_path.unlink()
+
+
+def test_obo_cache_rewrite_releases_mapping(tmp_path: Path, monkeypatch) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_with_relationships(), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    load_or_build_obo_cache(obo, cache_dir)
+
+    # Windows refuses to replace a mapped file, so no mapping may be alive
+    # when a hit is rewritten with a new relationship closure.
+    mappings: list[weakref.ref] = []
+    real_mmap = mmap.mmap
+    real_write = obo_cache._write_binary
+
+    def tracked_mmap(*args, **kwargs):
+        data = real_mmap(*args, **kwargs)
+        mappings.append(weakref.ref(data))
+        return data
+
+    def checked_write(*args, **kwargs):
+        assert mappings and all(ref() is None for ref in mappings)
+        real_write(*args, **kwargs)
+
+    monkeypatch.setattr(mmap, "mmap", tracked_mmap)
+    monkeypatch.setattr(obo_cache, "_write_binary", checked_write)
+    cached = load_or_build_obo_cache(obo, cache_dir, ["part_of"])
+    assert cached.cache_hit is True
+    assert cached.propagation_ancestors["GO:0000003"] == {"GO:0000001", "GO:0000002"}
+
+
+def test_obo_cache_rebuilds_truncated_binary(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    obo.write_text(_obo_with_relationships(), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    built = load_or_build_obo_cache(obo, cache_dir)
+    data = built.cache_path.read_bytes()
+
+    # Cuts into the last section (4 bytes + 4 padding), mid-file and mid-magic.
+    for size in (len(data) - 8, len(data) // 2, 5):
+        built.cache_path.write_bytes(data[:size])
+        rebuilt = load_or_build_obo_cache(obo, cache_dir)
+        assert rebuilt.cache_hit is False
+        assert dict(rebuilt.go_to_ancestors) == built.go_to_ancestors
+
+
+def test_compute_ancestors_handles_cycles() -> None:
+    # A -> B -> C -> A is a cycle; B also points at D, and E hangs below A.
+    closure = _compute_ancestors({"A": {"B"}, "B": {"C", "D"}, "C": {"A"}, "E": {"A"}})
+    for member in "ABC":
+        assert closure[member] == {"A", "B", "C", "D"}
+    assert closure["D"] == set()
+    assert closure["E"] == {"A", "B", "C", "D"}
+    assert _compute_ancestors({"X": {"Y"}, "Y": {"Z"}}) == {"X": {"Y", "Z"}, "Y": {"Z"}, "Z": set()}
+
+
+def test_obo_cache_cyclic_relationship_closure(tmp_path: Path) -> None:
+    obo = tmp_path / "go.obo"
+    text = _obo_with_relationships().replace(
+        "id: GO:0000002\nnamespace: biological_process\n",
+        "id: GO:0000002\nnamespace: biological_process\nrelationship: has_part GO:0000003\n",
+    )
+    obo.write_text(text, encoding="utf-8")
+    cached = load_or_build_obo_cache(obo, tmp_path / "cache", ["part_of", "has_part"])
+    # GO:0000002 <-> GO:0000003 form a cycle through part_of/has_part.
+    expected = {"GO:0000001", "GO:0000002", "GO:0000003"}
+    assert cached.propagation_ancestors["GO:0000002"] == expected
+    assert cached.propagation_ancestors["GO:0000003"] == expected
+    assert cached.propagation_ancestors["GO:0000004"] == set()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from gokit.cli.main import main
+from gokit.core.enrichment import OraRunner
+from gokit.core.parallel import run_batch_parallel
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_run_batch_parallel_matches_serial_order() -> None:
+    population = {f"g{i}" for i in range(30)}
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 6}", f"GO:000001{i % 4}"} for i in range(30)}
+    go_to_namespace = {goid: "biological_process" for v in gene_to_go.values() for goid in v}
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+    studies = [{f"g{j}" for j in range(i, 30, 7)} for i in range(9)]
+
+    serial = runner.run_batch(studies=studies, namespace_filter="all")
+    rows, stats = run_batch_parallel(runner, studies=studies, jobs=3, namespace_filter="all")
+
+    assert rows == serial
+    assert sum(s.studies for s in stats) == len(studies)
+    assert 1 <= len(stats) <= 3
+
+
+def test_enrich_jobs_output_identical(tmp_path: Path) -> None:
+    pop = tmp_path / "population.txt"
+    assoc = tmp_path / "assoc.txt"
+    obo = tmp_path / "go-basic.obo"
+    studies = tmp_path / "studies.tsv"
+    _write(pop, "".join(f"gene{i}\n" for i in range(20)))
+    _write(assoc, "".join(f"gene{i} GO:000000{1 + i % 3}\n" for i in range(20)))
+    _write(
+        obo,
+        "format-version: 1.2\n\n"
+        + "".join(
+            f"[Term]\nid: GO:000000{i}\nnamespace: biological_process\n\n" for i in (1, 2, 3)
+        ),
+    )
+    manifest_lines = []
+    for i in range(6):
+        study = tmp_path / f"s{i}.txt"
+        _write(study, "".join(f"gene{j}\n" for j in range(i, 20, 4)))
+        manifest_lines.append(f"study_{i}\t{study}\n")
+    _write(studies, "".join(manifest_lines))
+
+    outputs = []
+    for jobs in ("1", "3"):
+        out_dir = tmp_path / f"out{jobs}"
+        rc = main(
+            [
+                "enrich",
+                "--studies",
+                str(studies),
+                "--population",
+                str(pop),
+                "--assoc",
+                str(assoc),
+                "--assoc-format",
+                "id2gos",
+                "--obo",
+                str(obo),
+                "--out",
+                str(out_dir),
+                "--out-formats",
+                "tsv,jsonl",
+                "--jobs",
+                jobs,
+            ]
+        )
+        assert rc == 0
+        outputs.append(
+            [
+                (out_dir / "all_studies.tsv").read_bytes(),
+                (out_dir / "all_studies.jsonl").read_bytes(),
+            ]
+        )
+        notes = (out_dir.with_suffix(".manifest.json")).read_text(encoding="utf-8")
+        assert "worker_studies_per_s=0:" in notes
+
+    assert outputs[0] == outputs[1]
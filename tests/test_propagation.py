@@ -9,3 +9,18 @@ def test_propagate_gene_to_go_adds_ancestors() -> None:
 
     out = propagate_gene_to_go(gene_to_go, go_to_ancestors)
     assert out["g1"] == {"GO:0000002", "GO:0000001"}
+
+
+def test_propagate_shares_closures_across_genes() -> None:
+    gene_to_go = {
+        "g1": {"GO:0000002"},
+        "g2": {"GO:0000002"},
+        "g3": {"GO:0000002", "GO:0000001"},
+        "g4": {"GO:0000003"},
+    }
+    go_to_ancestors = {"GO:0000002": {"GO:0000001"}}
+
+    out = propagate_gene_to_go(gene_to_go, go_to_ancestors)
+    assert out["g1"] is out["g2"] is out["g3"]
+    assert out["g3"] == frozenset({"GO:0000001", "GO:0000002"})
+    assert out["g4"] == {"GO:0000003"}
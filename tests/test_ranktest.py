@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from math import erfc, sqrt
+from pathlib import Path
+
+import pytest
+
+from gokit.cli.main import main
+from gokit.core.enrichment import OraRunner
+from gokit.core.ranktest import average_ranks, run_rank_test
+from gokit.io.study import read_gene_scores
+
+
+def _runner() -> OraRunner:
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 3}", "GO:0000009"} for i in range(12)}
+    gene_to_go["g0"].add("GO:0000005")
+    return OraRunner(
+        population_genes=set(gene_to_go) | {"g99"},
+        gene_to_go=gene_to_go,
+        go_to_namespace={goid: "biological_process" for v in gene_to_go.values() for goid in v},
+    )
+
+
+def _brute_force(inside: list[float], outside: list[float]) -> tuple[float, float]:
+    # Pairwise U and the tie-corrected normal approximation.
+    u = sum((x > y) + 0.5 * (x == y) for x in inside for y in outside)
+    n1, n2 = len(inside), len(outside)
+    n = n1 + n2
+    _, ties = average_ranks(inside + outside)
+    var = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    return u, (u - n1 * n2 / 2) / sqrt(var)
+
+
+def test_average_ranks_share_ties() -> None:
+    assert average_ranks([3.0, 1.0, 3.0, 2.0]) == ([3.5, 1.0, 3.5, 2.0], 6.0)
+
+
+@pytest.mark.parametrize("test_direction", ["over", "under", "both"])
+def test_rank_test_matches_pairwise_mann_whitney(test_direction: str) -> None:
+    runner = _runner()
+    scores = {f"g{i}": float((i * 7) % 5) for i in range(12)}
+    scores["not_in_population"] = 100.0
+    table = run_rank_test(
+        runner, scores=scores, namespace_filter="all", test_direction=test_direction
+    )
+    # GO:0000009 holds every scored gene, so it has no contrast and is not tested.
+    assert len(table) == 4
+    assert "GO:0000009" not in table.go_id_column()
+    for row in table:
+        scored = [(g, s) for g, s in scores.items() if g in runner.population_genes]
+        inside = [s for g, s in scored if row.go_id in runner.gene_to_go[g]]
+        outside = [s for g, s in scored if row.go_id not in runner.gene_to_go[g]]
+        _, z = _brute_force(inside, outside)
+        over = test_direction == "over" or (test_direction == "both" and z >= 0)
+        assert row.direction == ("over" if over else "under")
+        assert row.study_count == len(inside)
+        assert row.study_n == 12
+        assert row.p_uncorrected == pytest.approx(0.5 * erfc((z if over else -z) / sqrt(2)))
+
+
+def test_rank_test_skips_terms_without_contrast() -> None:
+    runner = _runner()
+    # Only g1 and g2 scored: GO:0000000 and GO:0000005 have no scored genes.
+    table = run_rank_test(
+        runner, scores={"g1": 1.0, "g2": 2.0}, namespace_filter="all", method="bonferroni"
+    )
+    assert sorted(table.go_id_column()) == ["GO:0000001", "GO:0000002"]
+    for row in table:
+        assert row.p_adjusted == pytest.approx(min(1.0, 2 * row.p_uncorrected))
+
+    assert len(run_rank_test(runner, scores={}, namespace_filter="all")) == 0
+
+
+def test_cli_rank_mode_writes_single_study_outputs(tmp_path: Path) -> None:
+    pop = tmp_path / "population.txt"
+    assoc = tmp_path / "assoc.txt"
+    obo = tmp_path / "go-basic.obo"
+    scores = tmp_path / "scores.tsv"
+    pop.write_text("".join(f"gene{i}\n" for i in range(1, 9)), encoding="utf-8")
+    assoc.write_text("".join(f"gene{i} GO:000000{1 + i % 2}\n" for i in range(1, 9)), "utf-8")
+    terms = (f"[Term]\nid: GO:000000{i}\nnamespace: biological_process\n\n" for i in (1, 2))
+    obo.write_text("format-version: 1.2\n\n" + "".join(terms), encoding="utf-8")
+    scores.write_text(
+        "gene\tscore\n" + "".join(f"gene{i}\t{i * (-1) ** i}\n" for i in range(1, 9)),
+        encoding="utf-8",
+    )
+    out = tmp_path / "rank"
+    rc = main(
+        [
+            "enrich",
+            "--ranked-scores",
+            str(scores),
+            "--test",
+            "rank",
+            "--population",
+            str(pop),
+            "--assoc",
+            str(assoc),
+            "--assoc-format",
+            "id2gos",
+            "--obo",
+            str(obo),
+            "--out",
+            str(out),
+        ]
+    )
+    assert rc == 0
+    lines = out.with_suffix(".tsv").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert "test=rank" in out.with_suffix(".manifest.json").read_text(encoding="utf-8")
+
+
+def test_read_gene_scores_skips_only_a_header(tmp_path: Path) -> None:
+    path = tmp_path / "scores.tsv"
+    path.write_text("gene\tscore\ng1\t1.5\ng2\t-2\n", encoding="utf-8")
+    assert read_gene_scores(path) == {"g1": 1.5, "g2": -2.0}
+
+    path.write_text("g1\t1.5\ng2\t1,5\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":2: score is not a number"):
+        read_gene_scores(path)
+
+    path.write_text("gene\tscore\ng0\tx\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":2: score is not a number"):
+        read_gene_scores(path)
+
+    path.write_text("g1\tnan\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="not finite"):
+        read_gene_scores(path)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from gokit.cli.main import main
+from gokit.core.enrichment import OraRunner
+from gokit.core.resampling import PermutationFdr, build_null_index
+
+
+def _runner(backend: str = "auto") -> OraRunner:
+    population = {f"g{i:02d}" for i in range(40)}
+    gene_to_go = {f"g{i:02d}": {f"GO:000000{i % 5}", f"GO:000001{i % 3}"} for i in range(40)}
+    go_to_namespace = {
+        goid: "biological_process" for terms in gene_to_go.values() for goid in terms
+    }
+    return OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+        backend=backend,
+    )
+
+
+def _study() -> set[str]:
+    return {f"g{i:02d}" for i in range(0, 40, 5)} | {"g01", "g02"}
+
+
+def test_null_index_is_csr_over_tested_terms() -> None:
+    runner = _runner()
+    index = build_null_index(runner, namespace_filter="all")
+    assert index.pop_n == 40
+    assert len(index.indptr) == 41
+    assert len(index.indices) == index.indptr[-1] == 80
+    assert sorted(index.pop_counts) == sorted(runner.go_to_pop_count.values())
+    assert index.log_factorials is runner.log_factorials
+
+
+def test_permutation_fdr_is_seeded_and_independent_of_jobs() -> None:
+    runner = _runner()
+    study = _study()
+    outputs = []
+    for jobs in (1, 2):
+        rows = runner.run_study(study_genes=study, namespace_filter="all")
+        with PermutationFdr(
+            runner, namespace_filter="all", test_direction="both", seed=7, jobs=jobs
+        ) as fdr:
+            fdr.apply(rows, study_n=len(study), resamples=50, key="study")
+        outputs.append([(r.go_id, r.direction, r.p_adjusted) for r in rows])
+
+    assert outputs[0] == outputs[1]
+    assert all(0.0 <= p <= 1.0 for _, _, p in outputs[0])
+
+
+def test_permutation_fdr_backends_agree() -> None:
+    study = _study()
+    values = []
+    for backend in ("python", "auto"):
+        runner = _runner(backend)
+        rows = runner.run_study(study_genes=study, namespace_filter="all", test_direction="over")
+        fdr = PermutationFdr(runner, namespace_filter="all", test_direction="over", seed=3)
+        values.append(
+            fdr.estimate([r.p_uncorrected for r in rows], study_n=len(study), resamples=40, key="s")
+        )
+    assert values[0] == values[1]
+
+
+def _enrich_args(tmp_path: Path, study_genes: str = "gene0\ngene1\ngene2\n") -> list[str]:
+    pop = tmp_path / "population.txt"
+    study = tmp_path / "study.txt"
+    assoc = tmp_path / "assoc.txt"
+    obo = tmp_path / "go-basic.obo"
+    pop.write_text("".join(f"gene{i}\n" for i in range(12)), encoding="utf-8")
+    study.write_text(study_genes, encoding="utf-8")
+    assoc.write_text(
+        "".join(f"gene{i} GO:000000{1 + i % 3}\n" for i in range(12)),
+        encoding="utf-8",
+    )
+    obo.write_text(
+        "format-version: 1.2\n\n"
+        + "".join(
+            f"[Term]\nid: GO:000000{i}\nnamespace: biological_process\n\n" for i in (1, 2, 3)
+        ),
+        encoding="utf-8",
+    )
+    return [
+        "enrich",
+        "--study",
+        str(study),
+        "--population",
+        str(pop),
+        "--assoc",
+        str(assoc),
+        "--assoc-format",
+        "id2gos",
+        "--obo",
+        str(obo),
+        "--out",
+        str(tmp_path / "out"),
+        "--out-formats",
+        "jsonl",
+        "--seed",
+        "11",
+        "--fdr-resamples",
+        "25",
+    ]
+
+
+def test_enrich_fdr_resamples_records_manifest(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    rc = main(_enrich_args(tmp_path))
+    assert rc == 0
+    notes = json.loads(out.with_suffix(".manifest.json").read_text(encoding="utf-8"))["notes"]
+    assert "fdr_resamples=25" in notes
+    assert "fdr_seed=11" in notes
+    assert "p_adjusted_source=empirical_fdr" in notes
+    rows = [json.loads(line) for line in out.with_suffix(".jsonl").read_text().splitlines()]
+    assert rows and all(0.0 <= r["p_adjusted"] <= 1.0 for r in rows)
+
+
+def test_enrich_fdr_resamples_gates_items_by_empirical_fdr(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    # Every GO:0000001 gene: all BH-adjusted p-values are <= 0.2, but only
+    # GO:0000001 has an empirical FDR that low.
+    args = _enrich_args(tmp_path, "gene0\ngene3\ngene6\ngene9\n")
+    rc = main(args + ["--store-items", "always", "--store-items-alpha", "0.2"])
+    assert rc == 0
+    rows = [json.loads(line) for line in out.with_suffix(".jsonl").read_text().splitlines()]
+    assert [r["go_id"] for r in rows if "study_items" in r] == ["GO:0000001"]
+    assert all(("study_items" in r) == (r["p_adjusted"] <= 0.2) for r in rows)
+
+
+def test_enrich_rejects_tarone_with_fdr_resamples(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="--tarone cannot be combined"):
+        main(_enrich_args(tmp_path) + ["--tarone", "--test-direction", "over"])
+
+
+def test_permutation_fdr_pool_starts_on_first_use_and_closes() -> None:
+    runner = _runner()
+    with PermutationFdr(
+        runner, namespace_filter="all", test_direction="over", seed=5, jobs=2
+    ) as fdr:
+        assert fdr._executor is None
+        fdr.estimate([0.01, 0.5], study_n=10, resamples=4, key="s")
+        assert fdr._executor is not None
+    assert fdr._executor is None
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from gokit.core.enrichment import OraRunner
+from gokit.core.results import ResultTable
+from gokit.report.writers import write_combined_tsv, write_jsonl, write_tsv
+
+
+def _runner() -> OraRunner:
+    population = {f"g{i}" for i in range(12)}
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 4}", f"GO:000001{i % 3}"} for i in range(12)}
+    go_to_namespace = {goid: "biological_process" for v in gene_to_go.values() for goid in v}
+    go_to_namespace["GO:0000010"] = "molecular_function"
+    return OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+
+
+def test_table_rows_round_trip_and_sort() -> None:
+    table = _runner().run_study(
+        study_genes={"g0", "g4", "g8"}, namespace_filter="all", store_items=True
+    )
+    rows = list(table)
+    assert len(table) == len(rows) == 7
+    assert table[0] == rows[0]
+    assert table[-1] == rows[-1]
+    assert ResultTable.from_rows(rows) == table
+    assert rows == sorted(rows, key=lambda r: (r.p_adjusted, r.p_uncorrected, r.direction, r.go_id))
+
+    reversed_table = table.take(range(len(table) - 1, -1, -1))
+    assert reversed_table[0] == rows[-1]
+    assert reversed_table[0].study_items == rows[-1].study_items
+    assert reversed_table.sort() == table
+    assert table[1:3] == rows[1:3]
+
+
+def test_concat_slices_by_study() -> None:
+    runner = _runner()
+    a = runner.run_study(study_genes={"g0", "g4"}, namespace_filter="all")
+    b = runner.run_study(study_genes={"g1", "g2", "g3"}, namespace_filter="all")
+    combined = ResultTable.concat([("a", a), ("b", b)])
+
+    assert combined.go_ids is runner.annotation.go_ids
+    assert len(combined) == len(a) + len(b)
+    assert combined.study_id_column() == ["a"] * len(a) + ["b"] * len(b)
+    assert combined.for_study("b") == b
+    assert len(combined.for_study("missing")) == 0
+    # Reordered tables lose the recorded spans and fall back to a scan.
+    assert combined[:].for_study("a") == a
+    assert combined[:].for_study("b") == b
+
+
+def test_writers_accept_tables_and_legacy_rows(tmp_path: Path) -> None:
+    runner = _runner()
+    table = runner.run_study(study_genes={"g0", "g4"}, namespace_filter="all", store_items=True)
+
+    write_tsv(tmp_path / "t.tsv", table)
+    write_tsv(tmp_path / "l.tsv", list(table))
+    write_jsonl(tmp_path / "t.jsonl", table)
+    write_jsonl(tmp_path / "l.jsonl", list(table))
+    write_combined_tsv(tmp_path / "ct.tsv", ResultTable.concat([("s", table)]))
+    write_combined_tsv(tmp_path / "cl.tsv", [("s", row) for row in table])
+
+    assert (tmp_path / "t.tsv").read_bytes() == (tmp_path / "l.tsv").read_bytes()
+    assert (tmp_path / "t.jsonl").read_bytes() == (tmp_path / "l.jsonl").read_bytes()
+    assert (tmp_path / "ct.tsv").read_bytes() == (tmp_path / "cl.tsv").read_bytes()
+
+
+def test_to_arrow_dictionary_encodes_strings() -> None:
+    pa = pytest.importorskip("pyarrow")
+    runner = _runner()
+    table = runner.run_study(study_genes={"g0", "g4"}, namespace_filter="all")
+    arrow = ResultTable.concat([("s", table)]).to_arrow()
+
+    assert pa.types.is_dictionary(arrow.schema.field("go_id").type)
+    assert arrow.column("go_id").to_pylist() == table.go_id_column()
+    assert arrow.column("direction").to_pylist() == table.direction_column()
+    assert arrow.column("p_adjusted").to_pylist() == list(table.p_adjusted)
+    assert arrow.column("study_id").to_pylist() == ["s"] * len(table)
+
+
+def test_result_rows_are_slotted_with_shared_strings() -> None:
+    table = _runner().run_study(study_genes={"g0", "g4"}, namespace_filter="all")
+    rows = list(table)
+    assert not hasattr(rows[0], "__dict__")
+    assert len({id(r.namespace) for r in rows}) == len({r.namespace for r in rows})
+    assert len({id(r.direction) for r in rows}) == len({r.direction for r in rows})
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from gokit.core.enrichment import OraRunner, run_ora
 
 
@@ -50,3 +52,238 @@ def test_runner_has_population_cache() -> None:
     )
     assert runner.go_to_pop_count["GO:0000001"] == 1
     assert runner.go_to_pop_count["GO:0000002"] == 1
+
+
+def test_runner_owns_log_factorial_table() -> None:
+    population = {"a", "b", "c"}
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go={"a": {"GO:0000001"}},
+        go_to_namespace={"GO:0000001": "biological_process"},
+    )
+    assert len(runner.log_factorials) == len(population) + 1
+    assert runner.log_factorial_nbytes == 8 * (len(population) + 1)
+
+
+def test_runner_pvalue_cache_reused_across_studies() -> None:
+    population = {f"g{i}" for i in range(8)}
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 4}"} for i in range(8)}
+    go_to_namespace = {f"GO:000000{i}": "biological_process" for i in range(4)}
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+    first = runner.run_study(study_genes={"g0", "g1"}, namespace_filter="all")
+    entries = len(runner.pvalue_cache)
+    misses = runner.pvalue_cache.misses
+    second = runner.run_study(study_genes={"g2", "g3"}, namespace_filter="all")
+
+    assert entries == 1
+    assert runner.pvalue_cache.misses == misses
+    assert runner.pvalue_cache.hits == len(second)
+    assert sorted(r.p_uncorrected for r in first) == sorted(r.p_uncorrected for r in second)
+
+
+def test_runner_interns_annotation_as_csr() -> None:
+    population = {"b", "a", "c"}
+    gene_to_go = {
+        "a": {"GO:0000002", "GO:0000001"},
+        "b": {"GO:0000001"},
+        "x": {"GO:0000009"},
+    }
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace={"GO:0000001": "biological_process"},
+    )
+    index = runner.annotation
+    assert index.gene_ids == ["a", "b", "c"]
+    assert index.go_ids == ["GO:0000001", "GO:0000002"]
+    assert list(index.indptr) == [0, 2, 3, 3]
+    assert list(index.indices) == [0, 1, 0]
+    assert list(index.count_terms(index.gene_ints({"a", "b", "x"}))) == [2, 1]
+    assert runner.go_to_pop_count == {"GO:0000001": 2, "GO:0000002": 1}
+
+
+def test_run_batch_matches_per_study_runs(monkeypatch) -> None:
+    import gokit.core.enrichment as enrichment
+
+    monkeypatch.setattr(enrichment, "_BATCH_CELLS", 7)
+    population = {f"g{i}" for i in range(12)}
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 4}", f"GO:000001{i % 3}"} for i in range(12)}
+    go_to_namespace = {goid: "biological_process" for v in gene_to_go.values() for goid in v}
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+    studies = [{"g0", "g1", "g4"}, set(), {"g2", "g7", "g11", "zzz"}, {"g0", "g1", "g4"}]
+    for direction in ("over", "under", "both"):
+        batch = runner.run_batch(
+            studies=studies,
+            namespace_filter="all",
+            test_direction=direction,
+            store_items=True,
+        )
+        single = [
+            runner.run_study(
+                study_genes=study,
+                namespace_filter="all",
+                test_direction=direction,
+                store_items=True,
+            )
+            for study in studies
+        ]
+        assert batch == single
+
+
+def test_runner_tests_identical_term_gene_sets_once() -> None:
+    # GO:0000001 and GO:0000002 cover the same genes in different namespaces.
+    gene_to_go = {
+        "g1": {"GO:0000001", "GO:0000002", "GO:0000003"},
+        "g2": {"GO:0000001", "GO:0000002"},
+        "g3": {"GO:0000003"},
+        "g4": {"GO:0000004"},
+    }
+    runner = OraRunner(
+        population_genes={"g1", "g2", "g3", "g4", "g5"},
+        gene_to_go=gene_to_go,
+        go_to_namespace={
+            "GO:0000001": "biological_process",
+            "GO:0000002": "molecular_function",
+            "GO:0000003": "biological_process",
+            "GO:0000004": "biological_process",
+        },
+    )
+    assert list(runner._term_class) == [0, 0, 1, 2]
+    assert runner.n_term_classes == 3
+
+    rows = {r.go_id: r for r in runner.run_study(study_genes={"g1", "g2"}, namespace_filter="all")}
+    assert runner.tests_collapsed == 1
+    assert rows["GO:0000001"].p_uncorrected == rows["GO:0000002"].p_uncorrected
+    assert rows["GO:0000002"].namespace == "MF"
+
+    mf = runner.run_study(study_genes={"g1", "g2"}, namespace_filter="MF")
+    assert [r.go_id for r in mf] == ["GO:0000002"]
+    assert mf[0].p_uncorrected == rows["GO:0000002"].p_uncorrected
+    assert runner.tests_collapsed == 1
+
+
+def test_runner_tarone_prunes_untestable_terms() -> None:
+    population = {f"g{i}" for i in range(40)}
+    gene_to_go = {f"g{i}": {"GO:0000001"} for i in range(20)}
+    gene_to_go["g20"] = {"GO:0000002"}
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace={"GO:0000001": "biological_process", "GO:0000002": "biological_process"},
+    )
+    study = {f"g{i}" for i in range(8)} | {"g20"}
+    full = {
+        r.go_id: r
+        for r in runner.run_study(study_genes=study, namespace_filter="all", test_direction="over")
+    }
+    pruned = runner.run_study(
+        study_genes=study, namespace_filter="all", test_direction="over", tarone_alpha=0.01
+    )
+
+    # A single-gene term tops out at p = 9/40 with nine study genes.
+    assert [r.go_id for r in pruned] == ["GO:0000001"]
+    assert runner.terms_pruned == 1
+    assert pruned[0].p_uncorrected == full["GO:0000001"].p_uncorrected
+    assert pruned[0].p_adjusted == min(1.0, pruned[0].p_uncorrected)
+    with pytest.raises(ValueError):
+        runner.run_study(study_genes=study, namespace_filter="all", tarone_alpha=0.01)
+
+
+def test_runner_term_size_bounds_limit_candidates() -> None:
+    gene_to_go = {f"g{i}": {"GO:0000001"} for i in range(6)}
+    gene_to_go["g0"] |= {"GO:0000002", "GO:0000003"}
+    gene_to_go["g1"] |= {"GO:0000003"}
+    go_to_namespace = {
+        "GO:0000001": "biological_process",
+        "GO:0000002": "biological_process",
+        "GO:0000003": "molecular_function",
+    }
+    runner = OraRunner(
+        population_genes=set(gene_to_go),
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+        min_term_size=2,
+        max_term_size=5,
+    )
+    assert list(runner.candidates("all")) == [2]
+    assert list(runner.candidates("MF")) == [2]
+    assert list(runner.candidates("BP")) == []
+    assert list(runner.candidates("CC")) == []
+    assert runner.go_to_pop_count == {"GO:0000001": 6, "GO:0000002": 1, "GO:0000003": 2}
+
+    rows = runner.run_study(study_genes={"g0", "g1"}, namespace_filter="all")
+    assert [r.go_id for r in rows] == ["GO:0000003"]
+    assert len(runner.run_study(study_genes={"g0"}, namespace_filter="BP")) == 0
+
+
+def test_runner_precomputes_candidate_columns_per_namespace() -> None:
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 3}", "GO:0000009"} for i in range(9)}
+    runner = OraRunner(
+        population_genes=set(gene_to_go),
+        gene_to_go=gene_to_go,
+        go_to_namespace={
+            "GO:0000000": "biological_process",
+            "GO:0000001": "molecular_function",
+            "GO:0000002": "molecular_function",
+            "GO:0000009": "cellular_component",
+        },
+    )
+    mf = runner._candidates_for("molecular_function")
+    assert mf is runner._candidates_for("MF")
+    assert list(mf.terms) == [1, 2]
+    assert list(mf.pop_counts) == [3, 3]
+    assert {runner._namespaces[c] for c in mf.ns_codes} == {"MF"}
+    assert list(mf.classes) == [runner._term_class[1], runner._term_class[2]]
+
+    rows = runner.run_study(study_genes={"g1", "g4"}, namespace_filter="MF")
+    assert [r.go_id for r in rows] == ["GO:0000001", "GO:0000002"]
+    assert {r.namespace for r in rows} == {"MF"}
+
+
+def test_update_study_matches_rerun() -> None:
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 5}", f"GO:000001{i % 3}"} for i in range(30)}
+    runner = OraRunner(
+        population_genes=set(gene_to_go) | {"x1", "x2"},
+        gene_to_go=gene_to_go,
+        go_to_namespace={goid: "biological_process" for v in gene_to_go.values() for goid in v},
+    )
+    study = {"g1", "g2", "g6", "g11"}
+    handle = runner.open_study(study_genes=study, namespace_filter="all", store_items=True)
+    assert handle.results == runner.run_study(
+        study_genes=study, namespace_filter="all", store_items=True
+    )
+
+    # Unknown genes, re-adds and removals of absent genes are ignored.
+    rows = runner.update_study(
+        handle, delta_add={"g3", "g1", "unknown"}, delta_remove={"g2", "g29"}
+    )
+    study = {"g1", "g3", "g6", "g11"}
+    assert handle.study_n == 4
+    assert rows == runner.run_study(study_genes=study, namespace_filter="all", store_items=True)
+    assert list(handle.counts) == list(runner.annotation.count_terms(sorted(handle.genes)))
+
+    rows = runner.update_study(handle, delta_remove={"g3", "g6"})
+    assert rows == runner.run_study(
+        study_genes={"g1", "g11"}, namespace_filter="all", store_items=True
+    )
+
+
+def test_run_sweep_matches_prefix_studies() -> None:
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 4}", f"GO:000001{i % 3}"} for i in range(20)}
+    runner = OraRunner(
+        population_genes=set(gene_to_go),
+        gene_to_go=gene_to_go,
+        go_to_namespace={goid: "biological_process" for v in gene_to_go.values() for goid in v},
+    )
+    ranked = ["g7", "missing", "g2", "g9", "g4", "g13", "g0"]
+    tables = runner.run_sweep(ranked_genes=ranked, cutoffs=[5, 2, 7], namespace_filter="all")
+    for cutoff, table in zip([5, 2, 7], tables, strict=True):
+        assert table == runner.run_study(study_genes=set(ranked[:cutoff]), namespace_filter="all")
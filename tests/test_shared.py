@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from gokit.core.enrichment import OraRunner
+from gokit.core.interning import AnnotationIndex
+
+STUDY = {"g1", "g2", "g7", "g8"}
+
+
+def _runner() -> OraRunner:
+    population = {f"g{i}" for i in range(30)}
+    gene_to_go = {f"g{i}": {f"GO:000000{i % 6}", f"GO:000001{i % 4}"} for i in range(30)}
+    go_to_namespace = {goid: "biological_process" for v in gene_to_go.values() for goid in v}
+    return OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+
+
+def _attached_run(handle) -> list:
+    return OraRunner.attach_shared(handle).run_study(study_genes=STUDY, namespace_filter="all")
+
+
+def test_attached_runner_matches_owner() -> None:
+    runner = _runner()
+    with runner.export_shared() as handle:
+        attached = OraRunner.attach_shared(handle)
+        assert attached.go_to_pop_count == runner.go_to_pop_count
+        assert attached.population_genes == runner.population_genes
+        assert set(attached.gene_to_go["g1"]) == runner.gene_to_go["g1"]
+        assert attached.run_study(study_genes=STUDY, namespace_filter="all") == (
+            runner.run_study(study_genes=STUDY, namespace_filter="all")
+        )
+        with pytest.raises(TypeError):
+            attached.annotation.indices[0] = 1
+
+
+def test_spawned_worker_attaches_without_pickling_runner() -> None:
+    runner = _runner()
+    expected = runner.run_study(study_genes=STUDY, namespace_filter="all")
+    with (
+        runner.export_shared() as handle,
+        ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool,
+    ):
+        assert pool.submit(_attached_run, handle).result() == expected
+
+
+def test_attached_runner_reuses_owner_term_classes(monkeypatch: pytest.MonkeyPatch) -> None:
+    runner = _runner()
+    with runner.export_shared() as handle:
+
+        def rebuilt(self):
+            raise AssertionError("attached runner rebuilt its inverse")
+
+        monkeypatch.setattr(AnnotationIndex, "_invert", rebuilt)
+        attached = OraRunner.attach_shared(handle)
+        assert attached.n_term_classes == runner.n_term_classes
+        assert list(attached._term_class) == list(runner._term_class)
+        assert attached.pop_items("GO:0000001") == runner.pop_items("GO:0000001")
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from gokit.core.enrichment import run_ora
+from gokit.core.enrichment import OraRunner, run_ora
 
 
 def _dataset():
@@ -46,3 +46,36 @@ def test_store_items_always_on() -> None:
     assert rows
     assert rows[0].study_items is not None
     assert rows[0].pop_items is not None
+
+
+def test_store_items_gated_by_alpha_and_accessors() -> None:
+    study, population, gene_to_go, go_to_namespace = _dataset()
+    runner = OraRunner(
+        population_genes=population,
+        gene_to_go=gene_to_go,
+        go_to_namespace=go_to_namespace,
+    )
+    rows = runner.run_study(
+        study_genes=study,
+        namespace_filter="all",
+        test_direction="over",
+        store_items=True,
+        items_alpha=0.0,
+    )
+    assert rows
+    assert all(r.study_items is None and r.pop_items is None for r in rows)
+
+    assert runner.pop_items("GO:0000001") == {"g1", "g2"}
+    assert runner.study_items("GO:0000001", {"g1", "g3"}) == {"g1"}
+    assert runner.pop_items("GO:9999999") == set()
+
+    rows = runner.run_study(
+        study_genes=study,
+        namespace_filter="all",
+        store_items=True,
+        items_alpha=1.0,
+    )
+    by_go = {r.go_id: r for r in rows}
+    assert by_go["GO:0000001"].study_items == {"g1", "g2"}
+    assert by_go["GO:0000002"].study_items == set()
+    assert by_go["GO:0000002"].pop_items == {"g3", "g4"}
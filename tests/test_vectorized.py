@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from gokit.core.enrichment import OraRunner
+
+
+def _dataset():
+    population = {f"g{i}" for i in range(60)}
+    gene_to_go = {}
+    for i in range(60):
+        terms = {"GO:0000001"}
+        if i % 2 == 0:
+            terms.add("GO:0000002")
+        if i % 3 == 0:
+            terms.add("GO:0000003")
+        if i < 12:
+            terms.add("GO:0000004")
+        gene_to_go[f"g{i}"] = terms
+    go_to_namespace = {
+        "GO:0000001": "biological_process",
+        "GO:0000002": "biological_process",
+        "GO:0000003": "molecular_function",
+        "GO:0000004": "cellular_component",
+    }
+    study = {f"g{i}" for i in range(0, 20)}
+    return study, population, gene_to_go, go_to_namespace
+
+
+@pytest.mark.parametrize("method", ["fdr_bh", "holm"])
+@pytest.mark.parametrize("test_direction", ["over", "under", "both"])
+def test_numpy_backend_matches_scalar(test_direction: str, method: str) -> None:
+    pytest.importorskip("numpy")
+    study, population, gene_to_go, go_to_namespace = _dataset()
+    rows = {}
+    for backend in ("python", "numpy"):
+        runner = OraRunner(
+            population_genes=population,
+            gene_to_go=gene_to_go,
+            go_to_namespace=go_to_namespace,
+            backend=backend,
+        )
+        rows[backend] = runner.run_study(
+            study_genes=study,
+            namespace_filter="all",
+            method=method,
+            test_direction=test_direction,
+        )
+
+    assert [r.go_id for r in rows["python"]] == [r.go_id for r in rows["numpy"]]
+    for a, b in zip(rows["python"], rows["numpy"], strict=True):
+        assert a.direction == b.direction
+        assert b.p_uncorrected == pytest.approx(a.p_uncorrected, rel=1e-9)
+        assert b.p_adjusted == pytest.approx(a.p_adjusted, rel=1e-9)
+
+
+def test_runner_rejects_unknown_backend() -> None:
+    study, population, gene_to_go, go_to_namespace = _dataset()
+    with pytest.raises(ValueError):
+        OraRunner(
+            population_genes=population,
+            gene_to_go=gene_to_go,
+            go_to_namespace=go_to_namespace,
+            backend="gpu",
+        )
+
+
+def test_bh_adjust_array_matches_scalar() -> None:
+    pytest.importorskip("numpy")
+    from gokit.core.stats import bh_adjust
+    from gokit.core.vectorized import bh_adjust_array
+
+    vals = [0.01, 0.04, 0.04, 0.2, 0.0, 0.9, 0.03]
+    assert bh_adjust_array(vals).tolist() == bh_adjust(vals)
+    assert bh_adjust_array(vals, 20).tolist() == bh_adjust(vals, 20)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure memory held by enrichment result rows, reported per million rows."""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from array import array
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+from gokit.core.enrichment import EnrichmentResult
+from gokit.core.results import ResultTable
+
+NAMESPACES = ("biological_process", "molecular_function", "cellular_component")
+DIRECTIONS = ("over", "under")
+
+# The pre-slots layout: same fields, per-instance __dict__.
+DictEnrichmentResult = make_dataclass(
+    "DictEnrichmentResult", [(f.name, f.type, f) for f in fields(EnrichmentResult)]
+)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--terms", type=int, default=5000)
+    p.add_argument("--out", default="")
+    return p.parse_args()
+
+
+def _measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, held
+
+
+def _fresh(s: str) -> str:
+    # A new string object per row, as when rows are parsed from text.
+    return "".join(list(s))
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(0)
+    go_ids = [f"GO:{i:07d}" for i in range(args.terms)]
+    specs = [
+        (
+            rng.randrange(args.terms),
+            rng.randrange(3),
+            rng.randrange(2),
+            rng.randrange(1, 50),
+            rng.random(),
+        )
+        for _ in range(args.rows)
+    ]
+
+    def rows(cls, text):
+        return [
+            cls(
+                go_id=go_ids[t],
+                namespace=text(NAMESPACES[ns]),
+                direction=text(DIRECTIONS[d]),
+                study_count=k,
+                study_n=250,
+                pop_count=k * 4,
+                pop_n=20000,
+                p_uncorrected=p,
+                p_adjusted=min(1.0, p * 2),
+            )
+            for t, ns, d, k, p in specs
+        ]
+
+    def table():
+        return ResultTable(
+            go_ids=go_ids,
+            namespaces=list(NAMESPACES),
+            go_codes=array("i", (s[0] for s in specs)),
+            ns_codes=array("i", (s[1] for s in specs)),
+            over=array("b", (s[2] == 0 for s in specs)),
+            study_count=array("q", (s[3] for s in specs)),
+            study_n=array("q", [250]) * len(specs),
+            pop_count=array("q", (s[3] * 4 for s in specs)),
+            pop_n=array("q", [20000]) * len(specs),
+            p_uncorrected=array("d", (s[4] for s in specs)),
+            p_adjusted=array("d", (min(1.0, s[4] * 2) for s in specs)),
+        )
+
+    variants = {
+        "dict_dataclass": lambda: rows(DictEnrichmentResult, _fresh),
+        "slots_dataclass_interned": lambda: rows(EnrichmentResult, sys.intern),
+        "result_table": table,
+    }
+    scale = 1_000_000 / args.rows
+    result: dict[str, object] = {"rows": args.rows, "go_terms": args.terms}
+    for name, build in variants.items():
+        nbytes, held = _measure(build)
+        del held
+        result[f"{name}_mib_per_million_rows"] = round(nbytes * scale / (1 << 20), 1)
+        result[f"{name}_bytes_per_row"] = round(nbytes / args.rows, 1)
+    base = float(result["dict_dataclass_bytes_per_row"])
+    for name in ("slots_dataclass_interned", "result_table"):
+        result[f"{name}_reduction_x"] = round(base / float(result[f"{name}_bytes_per_row"]), 2)
+
+    text = json.dumps(result, indent=2, sort_keys=True)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())